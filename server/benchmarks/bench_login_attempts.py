@@ -0,0 +1,93 @@
+"""
+Concurrency check for failed-login accounting.
+
+Repeatedly fires User.MAX_LOGIN_ATTEMPTS simultaneous wrong-password
+attempts at one account from separate threads against a throwaway SQLite
+database. With read-modify-write accounting some increments get lost; with
+the atomic UPDATE every round must end with exactly MAX_LOGIN_ATTEMPTS
+counted and the account still unlocked, and one more failure must lock it.
+
+Usage:
+    python benchmarks/bench_login_attempts.py [--rounds 50]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_login_attempts.db")
+os.environ["TEST_DB_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ.pop("PROD", None)
+
+from setup import app, db, password_hasher
+from models.User import User
+
+
+def fail_once(barrier):
+    with app.app_context():
+        user = db.session.get(User, "1")
+        barrier.wait()
+        assert user.authenticate("wrong-password") is False
+        db.session.remove()
+
+
+def reset_counter():
+    with app.app_context():
+        db.session.execute(
+            User.__table__.update().where(User.id == "1").values(login_attempts=0, locked=False)
+        )
+        db.session.commit()
+
+
+def read_counter():
+    with app.app_context():
+        user = db.session.get(User, "1")
+        return user.login_attempts, user.locked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        db.session.execute(User.__table__.insert(), [{
+            "id": "1", "username": "hammered", "login_attempts": 0, "locked": False,
+            "password_hash": password_hasher.hash("correct-password"),
+        }])
+        db.session.commit()
+
+    threads_per_round = User.MAX_LOGIN_ATTEMPTS
+    start = time.perf_counter()
+    for round_number in range(args.rounds):
+        reset_counter()
+        barrier = threading.Barrier(threads_per_round)
+        threads = [threading.Thread(target=fail_once, args=(barrier,)) for _ in range(threads_per_round)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        attempts, locked = read_counter()
+        assert (attempts, locked) == (User.MAX_LOGIN_ATTEMPTS, False), (
+            f"round {round_number}: login_attempts={attempts} locked={locked}"
+        )
+    elapsed = time.perf_counter() - start
+
+    fail_once(threading.Barrier(1))
+    attempts, locked = read_counter()
+    assert locked, "account should lock after MAX_LOGIN_ATTEMPTS failures"
+
+    print(f"rounds:   {args.rounds} x {threads_per_round} concurrent failures in {elapsed:.2f}s")
+    print("OK: no lost increments, account locks on the next failure")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Login throughput benchmark for the password hashing pool.
+
+Simulates a login burst by verifying passwords from many request threads and
+reports verifications per second as pool workers are added.
+
+Usage:
+    python benchmarks/bench_password_hasher.py [--requests 200] [--threads 32]
+"""
+
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.PasswordHasher import PasswordHasher, _hash_password
+
+
+def run(workers, requests, threads, password_hash):
+    """
+    Verify `requests` passwords from `threads` request threads.
+
+    Returns:
+        float: Verifications per second
+    """
+    hasher = PasswordHasher(max_workers=workers, queue_size=threads, timeout=60)
+    # Warm the pool so process start-up isn't measured
+    hasher.verify("password", password_hash)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as request_threads:
+        results = list(request_threads.map(
+            lambda _: hasher.verify("password", password_hash), range(requests)
+        ))
+    elapsed = time.perf_counter() - start
+    hasher.shutdown()
+
+    assert all(results)
+    return requests / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    password_hash = _hash_password("password")
+    cores = os.cpu_count() or 1
+
+    worker_counts = [0] + sorted({2 ** i for i in range(cores.bit_length())} | {cores})
+    print(f"{'workers':>8} {'logins/s':>10} {'speedup':>8}")
+    baseline = None
+    for workers in worker_counts:
+        rate = run(workers, args.requests, args.threads, password_hash)
+        baseline = baseline or rate
+        label = "inline" if workers == 0 else str(workers)
+        print(f"{label:>8} {rate:>10.1f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
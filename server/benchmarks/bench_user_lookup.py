@@ -0,0 +1,81 @@
+"""
+Case-insensitive user lookup benchmark.
+
+Builds SQLite users tables of increasing size and times the lower(username)
+and lower(email) lookups used by Login and ResetPassword, with and without
+the expression indexes.
+
+Usage:
+    python benchmarks/bench_user_lookup.py [--sizes 1000,10000,100000,1000000]
+"""
+
+import time
+import random
+import sqlite3
+import argparse
+
+CREATE_USERS = """
+    CREATE TABLE users (
+        id VARCHAR PRIMARY KEY,
+        username VARCHAR NOT NULL UNIQUE,
+        password_hash VARCHAR NOT NULL,
+        email VARCHAR
+    )
+"""
+CREATE_INDEXES = (
+    "CREATE INDEX ix_users_lower_username ON users (lower(username))",
+    "CREATE INDEX ix_users_lower_email ON users (lower(email))",
+)
+QUERIES = {
+    "username": "SELECT id FROM users WHERE lower(username) = lower(?) LIMIT 1",
+    "email": "SELECT id FROM users WHERE lower(email) = lower(?) LIMIT 1",
+}
+
+
+def build(size, indexed):
+    conn = sqlite3.connect(":memory:")
+    conn.execute(CREATE_USERS)
+    conn.executemany(
+        "INSERT INTO users VALUES (?, ?, ?, ?)",
+        ((str(i), f"User{i:07d}", "x", f"User{i:07d}@Example.com") for i in range(size)),
+    )
+    if indexed:
+        for statement in CREATE_INDEXES:
+            conn.execute(statement)
+    conn.commit()
+    return conn
+
+
+def time_lookups(conn, size, column, lookups):
+    keys = [random.randrange(size) for _ in range(lookups)]
+    values = [
+        f"user{k:07d}" if column == "username" else f"user{k:07d}@example.com"
+        for k in keys
+    ]
+    start = time.perf_counter()
+    for value in values:
+        assert conn.execute(QUERIES[column], (value,)).fetchone()
+    return (time.perf_counter() - start) / lookups * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'users':>9} {'index':>6} {'username us':>12} {'email us':>10} {'plan'}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        for indexed in (False, True):
+            conn = build(size, indexed)
+            # Full scans are slow on big tables, keep unindexed runs short
+            lookups = args.lookups if indexed else max(1, min(args.lookups, 10_000_000 // size // 10))
+            username_us = time_lookups(conn, size, "username", lookups)
+            email_us = time_lookups(conn, size, "email", lookups)
+            plan = conn.execute("EXPLAIN QUERY PLAN " + QUERIES["email"], ("x",)).fetchone()[-1]
+            print(f"{size:>9} {'yes' if indexed else 'no':>6} {username_us:>12.1f} {email_us:>10.1f} {plan}")
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Serialization microbenchmark for user list responses.
+
+Compares loading full User objects and calling SerializerMixin.to_dict
+against the column Projection used by the user routes, on a throwaway
+SQLite database.
+
+Usage:
+    python benchmarks/bench_user_serializer.py [--users 5000] [--repeat 20]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_serializer.db")
+os.environ["TEST_DB_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.pop("PROD", None)
+
+from setup import app, db, current_time
+from models.User import User
+from routes.GetUsers import Users
+
+
+def seed(count):
+    rows = [
+        {
+            "id": str(i), "username": f"user{i:07d}", "password_hash": "x",
+            "email": f"user{i:07d}@example.com", "first_name": "First", "last_name": "Last",
+            "status": "Active", "locked": False, "login_attempts": 0,
+            "created_at": current_time(),
+        }
+        for i in range(count)
+    ]
+    db.session.execute(User.__table__.insert(), rows)
+    db.session.commit()
+
+
+def with_to_dict(per_page):
+    users = User.query.order_by(User.username).limit(per_page).all()
+    return [user.to_dict(only=Users.USER_FIELDS) for user in users]
+
+
+def with_projection(per_page):
+    rows = Users.USER_PROJECTION.apply(User.query.order_by(User.username)).limit(per_page).all()
+    return Users.USER_PROJECTION.rows(rows)
+
+
+def measure(fn, per_page, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        fn(per_page)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        seed(args.users)
+
+        assert with_to_dict(10) == with_projection(10)
+
+        print(f"{'per_page':>8} {'to_dict ms':>11} {'projection ms':>14} {'speedup':>8}")
+        for per_page in (10, 100, 1000):
+            orm_ms = measure(with_to_dict, per_page, args.repeat)
+            projection_ms = measure(with_projection, per_page, args.repeat)
+            print(f"{per_page:>8} {orm_ms:>11.2f} {projection_ms:>14.2f} {orm_ms / projection_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,44 @@
 #!/usr/bin/python3
-from setup import app, api
+import multiprocessing
 
-from routes.GetUsers import Users
+from setup import app, api, concurrency_limiter, email_worker
+
+from routes.GetUsers import Users, UserExport, UserImport
 from routes.Login import Login
 from routes.MyUser import MyUser
 from routes.Refresh import RefreshToken
 from routes.Logout import Logout
 from routes.GetUserById import UserById
 from routes.ResetPassword import ResetPassword
+from routes.AuditLog import AuditLog
+
+# Models only used through services still need registering for migrations
+from models.AuthCode import AuthCode
+from models.LoginActivity import LoginActivity
+from models.RevokedToken import RevokedToken
 
 # Flask restful api implementation
 
 api.add_resource(Users, '/users')
+api.add_resource(UserExport, '/users/export')
+api.add_resource(UserImport, '/users/import')
 api.add_resource(Login, '/login')
 api.add_resource(MyUser, '/user')
 api.add_resource(RefreshToken, '/refresh')
 api.add_resource(Logout, '/logout')
 api.add_resource(UserById,'/users/<string:id>')
 api.add_resource(ResetPassword, '/reset_password', '/reset_password/<string:reset_code>')
+api.add_resource(AuditLog, '/audit')
+
+# Admission control for resources with a configured concurrency limit
+for resource in (Users, UserExport, UserImport, Login, MyUser, RefreshToken, Logout, UserById, ResetPassword, AuditLog):
+    concurrency_limiter.protect(resource)
+
+# Send outbox rows left pending or awaiting retry by an earlier process without
+# waiting for a new email. Started here rather than in setup so migrations,
+# benchmarks and the hashing pool's child processes don't poll the outbox.
+if multiprocessing.parent_process() is None:
+    email_worker.start()
 
 if __name__ == "__main__":
     app.run(host='0.0.0.0',port=5252,debug=True)
@@ -0,0 +1,24 @@
+"""index auth_codes.email
+
+Revision ID: 4a0e6b2f7c19
+Revises: d17a3c5e9b82
+Create Date: 2026-10-16 14:58:30.671245
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a0e6b2f7c19'
+down_revision = 'd17a3c5e9b82'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f('ix_auth_codes_email'), 'auth_codes', ['email'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_auth_codes_email'), table_name='auth_codes')
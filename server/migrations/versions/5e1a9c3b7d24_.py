@@ -0,0 +1,26 @@
+"""add user row version
+
+Revision ID: 5e1a9c3b7d24
+Revises: 2b8f4d61e0a7
+Create Date: 2026-10-16 18:47:09.306152
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e1a9c3b7d24'
+down_revision = '2b8f4d61e0a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('version')
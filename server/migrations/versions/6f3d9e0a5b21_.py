@@ -0,0 +1,36 @@
+"""add login activity
+
+Revision ID: 6f3d9e0a5b21
+Revises: 4a0e6b2f7c19
+Create Date: 2026-10-16 16:20:48.113904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6f3d9e0a5b21'
+down_revision = '4a0e6b2f7c19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('login_activity',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('ip_address', sa.String(), nullable=True),
+    sa.Column('user_agent', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_login_activity'))
+    )
+    with op.batch_alter_table('login_activity', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_login_activity_user_id'), ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('login_activity', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_login_activity_user_id'))
+
+    op.drop_table('login_activity')
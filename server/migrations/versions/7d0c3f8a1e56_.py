@@ -0,0 +1,40 @@
+"""add auth_codes.user_id
+
+Revision ID: 7d0c3f8a1e56
+Revises: 5e1a9c3b7d24
+Create Date: 2026-10-16 19:26:51.874203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d0c3f8a1e56'
+down_revision = '5e1a9c3b7d24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('auth_codes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('user_id', sa.String(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_auth_codes_user_id'), ['user_id'], unique=False)
+        batch_op.create_foreign_key(batch_op.f('fk_auth_codes_user_id_users'), 'users', ['user_id'], ['id'], ondelete='CASCADE')
+
+    # Match outstanding codes to their user the same way the old lookup did.
+    # Codes are short-lived, so one statement covers the table.
+    op.execute(
+        "UPDATE auth_codes SET user_id = ("
+        "SELECT users.id FROM users "
+        "WHERE lower(users.email) = lower(auth_codes.email) "
+        "ORDER BY users.id LIMIT 1"
+        ") WHERE user_id IS NULL"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('auth_codes', schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f('fk_auth_codes_user_id_users'), type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_auth_codes_user_id'))
+        batch_op.drop_column('user_id')
@@ -0,0 +1,27 @@
+"""add lower(username) and lower(email) indexes
+
+Revision ID: 8e4b7a90c1d3
+Revises: 3c9d1f6a2b47
+Create Date: 2026-10-16 10:03:17.550921
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4b7a90c1d3'
+down_revision = '3c9d1f6a2b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Expression indexes work on both Postgres and SQLite (3.9+)
+    op.create_index('ix_users_lower_username', 'users', [sa.text('lower(username)')], unique=False)
+    op.create_index('ix_users_lower_email', 'users', [sa.text('lower(email)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_users_lower_email', table_name='users')
+    op.drop_index('ix_users_lower_username', table_name='users')
@@ -0,0 +1,73 @@
+"""add audit events
+
+Revision ID: 9c2e5a7d3f18
+Revises: 6f3d9e0a5b21
+Create Date: 2026-10-16 17:05:12.640218
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c2e5a7d3f18'
+down_revision = '6f3d9e0a5b21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # Range partitioned by month. The primary key has to include the
+        # partition key. Monthly partitions are created and dropped by
+        # AuditWriter.maintain; the default partition catches anything else.
+        op.execute(
+            "CREATE TABLE audit_events ("
+            "id BIGINT GENERATED BY DEFAULT AS IDENTITY, "
+            "created_at TIMESTAMP WITH TIME ZONE NOT NULL, "
+            "actor_id VARCHAR, "
+            "action VARCHAR NOT NULL, "
+            "target_type VARCHAR, "
+            "target_id VARCHAR, "
+            "details JSON, "
+            "CONSTRAINT pk_audit_events PRIMARY KEY (id, created_at)"
+            ") PARTITION BY RANGE (created_at)"
+        )
+        op.execute("CREATE TABLE audit_events_default PARTITION OF audit_events DEFAULT")
+
+        # This month's and next month's partitions must exist before the
+        # first event is written. Once the default partition holds rows for a
+        # month, Postgres won't create that month's partition
+        today = date.today()
+        for offset in range(2):
+            year, month = today.year + (today.month - 1 + offset) // 12, (today.month - 1 + offset) % 12 + 1
+            start = date(year, month, 1)
+            end = date(year + month // 12, month % 12 + 1, 1)
+            op.execute(
+                f"CREATE TABLE audit_events_y{start.year:04d}m{start.month:02d} "
+                f"PARTITION OF audit_events FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+    else:
+        op.create_table('audit_events',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('actor_id', sa.String(), nullable=True),
+        sa.Column('action', sa.String(), nullable=False),
+        sa.Column('target_type', sa.String(), nullable=True),
+        sa.Column('target_id', sa.String(), nullable=True),
+        sa.Column('details', sa.JSON(), nullable=True),
+        sa.PrimaryKeyConstraint('id', name=op.f('pk_audit_events'))
+        )
+
+    # Indexes on a partitioned table are created on every partition
+    op.create_index('ix_audit_events_created_at_id', 'audit_events', ['created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_audit_events_target_id'), 'audit_events', ['target_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_audit_events_target_id'), table_name='audit_events')
+    op.drop_index('ix_audit_events_created_at_id', table_name='audit_events')
+    # Dropping the parent drops every partition with it
+    op.drop_table('audit_events')
@@ -0,0 +1,71 @@
+"""add user search indexes (pg_trgm on Postgres, FTS5 on SQLite)
+
+Revision ID: b5f2e81d4c60
+Revises: 8e4b7a90c1d3
+Create Date: 2026-10-16 11:26:04.318752
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5f2e81d4c60'
+down_revision = '8e4b7a90c1d3'
+branch_labels = None
+depends_on = None
+
+
+SEARCH_COLUMNS = ('id', 'username', 'email', 'first_name', 'last_name')
+FTS_COLUMNS = ', '.join(SEARCH_COLUMNS)
+NEW_VALUES = ', '.join(f'new.{column}' for column in SEARCH_COLUMNS)
+OLD_VALUES = ', '.join(f'old.{column}' for column in SEARCH_COLUMNS)
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for column in SEARCH_COLUMNS:
+            op.execute(
+                f'CREATE INDEX ix_users_trgm_{column} ON users '
+                f'USING gin (lower({column}) gin_trgm_ops)'
+            )
+
+    elif dialect == 'sqlite':
+        # External content table kept in sync with users by triggers
+        op.execute(
+            f"CREATE VIRTUAL TABLE users_fts USING fts5({FTS_COLUMNS}, "
+            f"content='users', content_rowid='rowid', tokenize='trigram')"
+        )
+        op.execute(f"""
+            CREATE TRIGGER users_fts_ai AFTER INSERT ON users BEGIN
+                INSERT INTO users_fts(rowid, {FTS_COLUMNS}) VALUES (new.rowid, {NEW_VALUES});
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER users_fts_ad AFTER DELETE ON users BEGIN
+                INSERT INTO users_fts(users_fts, rowid, {FTS_COLUMNS}) VALUES ('delete', old.rowid, {OLD_VALUES});
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER users_fts_au AFTER UPDATE ON users BEGIN
+                INSERT INTO users_fts(users_fts, rowid, {FTS_COLUMNS}) VALUES ('delete', old.rowid, {OLD_VALUES});
+                INSERT INTO users_fts(rowid, {FTS_COLUMNS}) VALUES (new.rowid, {NEW_VALUES});
+            END
+        """)
+        op.execute("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        for column in SEARCH_COLUMNS:
+            op.execute(f'DROP INDEX IF EXISTS ix_users_trgm_{column}')
+
+    elif dialect == 'sqlite':
+        for trigger in ('users_fts_ai', 'users_fts_ad', 'users_fts_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS users_fts')
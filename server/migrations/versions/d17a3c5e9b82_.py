@@ -0,0 +1,109 @@
+"""convert string timestamps to timestamptz
+
+Revision ID: d17a3c5e9b82
+Revises: b5f2e81d4c60
+Create Date: 2026-10-16 13:41:55.082416
+
+"""
+import re
+from datetime import datetime
+
+import pytz
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd17a3c5e9b82'
+down_revision = 'b5f2e81d4c60'
+branch_labels = None
+depends_on = None
+
+
+# (table, column, nullable)
+COLUMNS = (
+    ('users', 'created_at', False),
+    ('users', 'last_login', True),
+    ('auth_codes', 'created_at', False),
+)
+BATCH_SIZE = 5000
+MOUNTAIN = pytz.timezone('America/Denver')
+
+
+def parse_timestamp(value):
+    """
+    Parse the str(current_time()) values the String columns held.
+    Postgres may have returned offsets as '-07', which fromisoformat rejects.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(re.sub(r'([+-]\d{2})$', r'\1:00', value.strip()))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = MOUNTAIN.localize(parsed)
+    return parsed.astimezone(MOUNTAIN)
+
+
+def backfill(bind, table, column):
+    """
+    Copy column into column_ts one keyset batch at a time so no single
+    statement locks the whole table.
+    """
+    select_batch = sa.text(
+        f'SELECT id, {column} FROM {table} WHERE id > :last_id ORDER BY id LIMIT :limit'
+    )
+    update_row = sa.text(
+        f'UPDATE {table} SET {column}_ts = :value WHERE id = :id'
+    ).bindparams(sa.bindparam('value', type_=sa.DateTime(timezone=True)))
+
+    last_id = ''
+    while True:
+        rows = bind.execute(select_batch, {'last_id': last_id, 'limit': BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        # Unparseable values fall back to the migration time for NOT NULL columns
+        fallback = datetime.now(MOUNTAIN)
+        bind.execute(update_row, [
+            {'id': row[0], 'value': parse_timestamp(row[1]) or (fallback if column == 'created_at' else None)}
+            for row in rows
+        ])
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+
+    for table, column, _ in COLUMNS:
+        op.add_column(table, sa.Column(f'{column}_ts', sa.DateTime(timezone=True), nullable=True))
+
+    for table, column, _ in COLUMNS:
+        backfill(bind, table, column)
+
+    # Plain ALTERs (SQLite 3.35+) so SQLite doesn't rebuild users, which would
+    # renumber rowids and drop the users_fts triggers
+    for table, column, nullable in COLUMNS:
+        op.execute(f'ALTER TABLE {table} DROP COLUMN {column}')
+        op.execute(f'ALTER TABLE {table} RENAME COLUMN {column}_ts TO {column}')
+        if not nullable and dialect == 'postgresql':
+            op.alter_column(table, column, nullable=False)
+
+    op.create_index(op.f('ix_auth_codes_created_at'), 'auth_codes', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_auth_codes_created_at'), table_name='auth_codes')
+
+    bind = op.get_bind()
+    for table, column, _ in COLUMNS:
+        op.add_column(table, sa.Column(f'{column}_str', sa.String(), nullable=True))
+        rows = bind.execute(sa.text(f'SELECT id, {column} FROM {table}')).fetchall()
+        if rows:
+            bind.execute(
+                sa.text(f'UPDATE {table} SET {column}_str = :value WHERE id = :id'),
+                [{'id': row[0], 'value': str(row[1]) if row[1] is not None else None} for row in rows],
+            )
+        op.execute(f'ALTER TABLE {table} DROP COLUMN {column}')
+        op.execute(f'ALTER TABLE {table} RENAME COLUMN {column}_str TO {column}')
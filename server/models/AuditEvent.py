@@ -0,0 +1,29 @@
+from sqlalchemy_serializer import SerializerMixin
+from setup import db, current_time
+
+
+class AuditEvent(db.Model, SerializerMixin):
+    """
+    Model representing an append-only audit trail entry.
+    Rows are inserted in batches by the audit writer and never updated.
+
+    On Postgres the table is range partitioned by month on created_at
+    (see the audit events migration and AuditWriter.maintain).
+    """
+
+    __tablename__ = "audit_events"
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True)
+    created_at = db.Column(db.DateTime(timezone=True), default=current_time, nullable=False)
+
+    # Who did what to which record
+    actor_id = db.Column(db.String)
+    action = db.Column(db.String, nullable=False)
+    target_type = db.Column(db.String)
+    target_id = db.Column(db.String, index=True)
+    details = db.Column(db.JSON)
+
+    # Keyset pagination over (created_at, id)
+    __table_args__ = (
+        db.Index("ix_audit_events_created_at_id", created_at, id),
+    )
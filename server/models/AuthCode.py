@@ -1,51 +1,123 @@
 from sqlalchemy_serializer import SerializerMixin
-from sqlalchemy.orm import validates
-from setup import db, generate_unique_uuid, current_time, timedelta, datetime
+from sqlalchemy.orm import validates, joinedload
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
+from setup import app, db, generate_code, current_time, timedelta, datetime, pytz
 from sqlalchemy.ext.hybrid import hybrid_property
 from models.User import User
 
 class AuthCode(db.Model, SerializerMixin):
     __tablename__ = 'auth_codes'
 
-    id = db.Column(db.String, primary_key=True, default=lambda: generate_unique_uuid(AuthCode))
+    # Codes expire AUTH_CODE_TTL seconds (5 minutes by default) after they are issued
+    LIFETIME = timedelta(seconds=app.config['AUTH_CODE_TTL'])
 
-    email = db.Column(db.String, nullable=False)
+    # Attempts at drawing an unused code before giving up
+    ISSUE_ATTEMPTS = 5
+
+    id = db.Column(db.String, primary_key=True, default=generate_code)
+
+    email = db.Column(db.String, nullable=False, index=True)
+
+    # Set when the code is issued. NULL only for legacy codes with no matching user
+    user_id = db.Column(db.String, db.ForeignKey("users.id", ondelete="CASCADE"), index=True)
     
-    created_at = db.Column(db.String, default=current_time, nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), default=current_time, nullable=False, index=True)
+
+    # lookup() joins the user into the same SELECT as the code
+    user = db.relationship(User)
 
-    @hybrid_property
-    def user(self):
-        if found := User.query.filter(
-                        db.func.lower(User.email) == db.func.lower(self.email)
-                    ).first():
-            return found
-        else:
-            return None
-        
     @hybrid_property
     def is_expired(self):
-        # Expires in 5 minutes
-        from datetime import datetime, timedelta
-        import re
-        
-        try:
-            # Handle the timezone format issue
-            created_at_str = str(self.created_at)
-            
-            # Fix timezone format: convert '-07' to '-07:00' if needed
-            # This regex matches timezone formats like '-07', '+05', etc. and converts them
-            created_at_str = re.sub(r'([+-]\d{2})$', r'\1:00', created_at_str)
-            
-            # Parse the corrected datetime string
-            created_at_dt = datetime.fromisoformat(created_at_str)
-            
-            # Calculate expiration time
-            expiration_time = created_at_dt + timedelta(minutes=5)
-            
-            # Compare with current time
-            return current_time() > expiration_time
-            
-        except (ValueError, TypeError) as e:
-            # If parsing fails, treat as expired for security
-            print(f"Error parsing created_at: {e}")
-            return True
\ No newline at end of file
+        created_at = self.created_at
+        if created_at.tzinfo is None:
+            # SQLite drops the offset, values are stored in Mountain Time
+            created_at = pytz.timezone('America/Denver').localize(created_at)
+        return current_time() > created_at + self.LIFETIME
+
+    @is_expired.expression
+    def is_expired(cls):
+        return cls.created_at < current_time() - cls.LIFETIME
+
+    @classmethod
+    def issue(cls, email, replace=True, user_id=None):
+        """
+        Insert a new code for an email, relying on the primary key to catch
+        collisions instead of checking for the code first. Nothing is committed.
+
+        Args:
+            email (str): Email the code belongs to
+            replace (bool, optional): Delete the email's existing codes first. Defaults to True.
+            user_id (str, optional): ID of the user the code is for
+
+        Returns:
+            str: The new code
+
+        Raises:
+            RuntimeError: If no unused code was drawn in ISSUE_ATTEMPTS tries
+        """
+        if replace:
+            db.session.execute(
+                db.delete(cls).where(cls.email == email).execution_options(synchronize_session=False)
+            )
+
+        dialect = db.session.get_bind().dialect.name
+        for _ in range(cls.ISSUE_ATTEMPTS):
+            code = generate_code()
+            values = {"id": code, "email": email, "user_id": user_id, "created_at": current_time()}
+
+            if dialect in ("postgresql", "sqlite"):
+                insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+                inserted = db.session.execute(
+                    insert(cls).values(**values).on_conflict_do_nothing(index_elements=[cls.id]).returning(cls.id)
+                ).scalar()
+                if inserted is not None:
+                    return code
+            else:
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(db.insert(cls).values(**values))
+                    return code
+                except IntegrityError:
+                    continue
+
+        raise RuntimeError("Could not generate a unique code, please try again.")
+
+    @classmethod
+    def lookup(cls, code):
+        """
+        Load a code, its user and its expiry state in a single query.
+
+        Args:
+            code (str): Code to look up
+
+        Returns:
+            tuple: (AuthCode, bool expired), or (None, None) if not found
+        """
+        row = (
+            db.session.query(cls, cls.is_expired)
+            .options(joinedload(cls.user))
+            .filter(cls.id == code)
+            .first()
+        )
+        if not row:
+            return None, None
+        return row[0], bool(row[1])
+
+    @classmethod
+    def purge_expired(cls, batch_size=1000):
+        """
+        Delete up to batch_size expired codes.
+
+        Args:
+            batch_size (int, optional): Rows to delete. Defaults to 1000.
+
+        Returns:
+            int: Number of rows deleted
+        """
+        expired_ids = db.select(cls.id).where(cls.is_expired).limit(batch_size).scalar_subquery()
+        result = db.session.execute(
+            db.delete(cls).where(cls.id.in_(expired_ids)).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount
@@ -0,0 +1,64 @@
+from sqlalchemy_serializer import SerializerMixin
+from setup import db, current_time
+
+
+class EmailOutbox(db.Model, SerializerMixin):
+    """
+    Model representing an email waiting to be delivered by the outbox worker.
+    Rows are written in the same transaction as the data they refer to.
+    """
+
+    __tablename__ = "email_outbox"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Message
+    sender = db.Column(db.String, nullable=False)
+    recipient = db.Column(db.String, nullable=False)
+    subject = db.Column(db.String, nullable=False)
+    html = db.Column(db.Text, nullable=False)
+
+    # Delivery state
+    status = db.Column(db.String, default="pending", nullable=False, index=True)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.String)
+
+    # Timestamps
+    created_at = db.Column(db.DateTime(timezone=True), default=current_time, nullable=False)
+    next_attempt_at = db.Column(db.DateTime(timezone=True), default=current_time, nullable=False)
+    sent_at = db.Column(db.DateTime(timezone=True))
+
+    DEFAULT_SENDER = "Admin <Administrator@templatesite.app>"
+
+    @classmethod
+    def enqueue(cls, recipient, subject, html, sender=DEFAULT_SENDER):
+        """
+        Add an email to the current session. It is sent once the
+        transaction commits and the worker picks it up.
+
+        Args:
+            recipient (str): Recipient email address
+            subject (str): Email subject
+            html (str): Email body
+            sender (str, optional): From address
+
+        Returns:
+            EmailOutbox: The pending outbox row
+        """
+        message = cls(sender=sender, recipient=recipient, subject=subject, html=html)
+        db.session.add(message)
+        return message
+
+    def to_message(self):
+        """
+        Convert the row into a transport message.
+
+        Returns:
+            dict: Message in Resend's format
+        """
+        return {
+            "from": self.sender,
+            "to": [self.recipient],
+            "subject": self.subject,
+            "html": self.html,
+        }
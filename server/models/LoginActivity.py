@@ -0,0 +1,17 @@
+from sqlalchemy_serializer import SerializerMixin
+from setup import db, current_time
+
+
+class LoginActivity(db.Model, SerializerMixin):
+    """
+    Model representing a successful login.
+    Rows are written in batches by the login activity buffer.
+    """
+
+    __tablename__ = "login_activity"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.String, nullable=False, index=True)
+    ip_address = db.Column(db.String)
+    user_agent = db.Column(db.String)
+    created_at = db.Column(db.DateTime(timezone=True), default=current_time, nullable=False)
@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+
+from sqlalchemy_serializer import SerializerMixin
+from setup import db
+
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+
+class RevokedToken(db.Model, SerializerMixin):
+    """
+    Model representing a revoked JWT, kept until the token would have expired.
+    Written and read through the token revocation store.
+
+    Times are UTC, unlike the rest of the schema. They are compared with
+    values built from Unix timestamps, and SQLite keeps no offset to convert with.
+    """
+
+    __tablename__ = "revoked_tokens"
+
+    jti = db.Column(db.String, primary_key=True)
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime(timezone=True), default=utc_now, nullable=False, index=True)
@@ -1,9 +1,10 @@
 from sqlalchemy_serializer import SerializerMixin
-from sqlalchemy.orm import validates
+from sqlalchemy import event, update, case, func
+from sqlalchemy.orm import Session, validates, make_transient_to_detached, object_session
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.ext.hybrid import hybrid_property
-import base64
 
-from setup import db, bcrypt, current_time
+from setup import db, current_time, password_hasher, PasswordHasherBusy, user_cache, user_list_cache
 
 class User(db.Model, SerializerMixin):
     """
@@ -12,6 +13,9 @@ class User(db.Model, SerializerMixin):
 
     __tablename__ = "users"
 
+    # Failed attempts allowed before the next failure locks the account
+    MAX_LOGIN_ATTEMPTS = 5
+
     # Primary fields
     id = db.Column(db.String, primary_key=True)
     username = db.Column(db.String, nullable=False, unique=True)
@@ -27,11 +31,23 @@ class User(db.Model, SerializerMixin):
     status = db.Column(db.String, default="Active")
     locked = db.Column(db.Boolean, default=False)
 
+    # Embedded in JWTs as "ver", bumped to revoke every session at once
+    token_version = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+
+    # Row version, bumped on every write. Drives ETags and If-Match
+    version = db.Column(db.Integer, default=1, server_default="1", nullable=False)
+
     # Timestamps
-    created_at = db.Column(db.String, default=current_time, nullable=False)
-    last_login = db.Column(db.String, default=current_time)
+    created_at = db.Column(db.DateTime(timezone=True), default=current_time, nullable=False)
+    last_login = db.Column(db.DateTime(timezone=True), default=current_time)
     start_date = db.Column(db.String)
 
+    # Expression indexes for case-insensitive lookups (Postgres and SQLite)
+    __table_args__ = (
+        db.Index("ix_users_lower_username", db.func.lower(username)),
+        db.Index("ix_users_lower_email", db.func.lower(email)),
+    )
+
     # Password handling
     @hybrid_property
     def password(self):
@@ -47,63 +63,175 @@ class User(db.Model, SerializerMixin):
     def password(self, password):
         """
         Password setter - hashes and stores the password.
+        Hashing runs on the password hashing pool.
 
         Args:
             password (str): Plain text password to hash and store
+
+        Raises:
+            PasswordHasherBusy: If the hashing pool is saturated
         """
-        hashed_password = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
-        self.password_hash = base64.b64encode(hashed_password).decode("utf-8")
+        self.password_hash = password_hasher.hash(password)
         
 
     def authenticate(self, password):
         """
         Verify if the provided password matches the stored hash.
+        Failed attempts are counted with a single atomic UPDATE so concurrent
+        attempts can't lose increments; a successful login only writes when
+        there is a counter to reset.
 
         Args:
             password (str): Plain text password to check
 
         Returns:
             bool: True if password matches, False otherwise
+
+        Raises:
+            PasswordHasherBusy: If the hashing pool is saturated
         """
         # print(f"Username: {self.username}")
         # print(f"Input password: {password}")
         # print(f"Stored hash type before decode: {type(self.password_hash)}")
 
         try:
-            hashed_password = base64.b64decode(self.password_hash.encode("utf-8"))
-            # print(f"Decoded hash: {hashed_password}")
-            # print(f"Decoded hash type: {type(hashed_password)}")
-            # print(f"Password bytes: {password.encode('utf-8')}")
-
-            # Check if the hash follows bcrypt format (starts with $2b$)
-            # if not hashed_password.startswith(b'$2b$'):
-            # print("WARNING: Hash doesn't appear to be in proper bcrypt format")
-
-            result = bcrypt.checkpw(password.encode("utf-8"), hashed_password)
+            result = password_hasher.verify(password, self.password_hash)
             # print(f"Authentication result: {result}")
+        except PasswordHasherBusy:
+            # Saturation is not a failed attempt, let the caller shed the request
+            raise
         except Exception as e:
             print(f"Exception during authentication: {e}")
             return False
 
-        if not result:
-            if self.login_attempts is not None and self.login_attempts >= 5:
-                self.locked = True
-            else:
-                self.login_attempts = (
-                    self.login_attempts + 1 if self.login_attempts is not None else 1
-                )
+        if result and not self.login_attempts:
+            return result
+
+        attempts = func.coalesce(User.login_attempts, 0)
+        if result:
+            statement = (
+                update(User)
+                .where(User.id == self.id, attempts != 0)
+                .values(login_attempts=0, version=User.version + 1)
+                .returning(User.login_attempts, User.locked, User.token_version, User.version)
+            )
         else:
-            self.login_attempts = 0
+            statement = (
+                update(User)
+                .where(User.id == self.id)
+                .values(
+                    login_attempts=case((attempts >= self.MAX_LOGIN_ATTEMPTS, attempts), else_=attempts + 1),
+                    locked=case((attempts >= self.MAX_LOGIN_ATTEMPTS, True), else_=func.coalesce(User.locked, False)),
+                    # Locking the account also revokes its sessions
+                    token_version=case((attempts >= self.MAX_LOGIN_ATTEMPTS, User.token_version + 1), else_=User.token_version),
+                    version=User.version + 1,
+                )
+                .returning(User.login_attempts, User.locked, User.token_version, User.version)
+            )
 
         try:
+            row = db.session.execute(statement.execution_options(synchronize_session=False)).first()
             db.session.commit()
         except Exception as e:
+            db.session.rollback()
             print(f"Database error: {e}")
-            return {"error": "An error occurred while authenticating"}, 400
+            return result
+
+        # Core UPDATEs skip mapper events, so sync the instance and caches by hand
+        user_cache.invalidate(self.id)
+        user_list_cache.invalidate()
+        if row is not None:
+            set_committed_value(self, "login_attempts", row[0])
+            set_committed_value(self, "locked", row[1])
+            set_committed_value(self, "token_version", row[2])
+            set_committed_value(self, "version", row[3])
 
         return result
     
 
+    def revoke_sessions(self):
+        """
+        Invalidate every access and refresh token issued to this user by
+        bumping token_version. Takes effect when the session commits.
+        """
+        self.token_version = User.token_version + 1
+
+    @property
+    def etag(self):
+        """
+        Strong ETag value for this row, see make_etag.
+        """
+        return self.make_etag(self.id, self.version)
+
+    @staticmethod
+    def make_etag(id, version):
+        """
+        Build the strong ETag value for a user row.
+
+        Args:
+            id (str): User ID
+            version (int): Row version
+
+        Returns:
+            str: Unquoted ETag value
+        """
+        return f"user-{id}-v{version}"
+
+    # Lookups
+    @classmethod
+    def find_by_username(cls, username):
+        """
+        Case-insensitive lookup served by ix_users_lower_username.
+
+        Args:
+            username (str): Username in any case
+
+        Returns:
+            User: Matching user or None
+        """
+        return cls.query.filter(db.func.lower(cls.username) == db.func.lower(username)).first()
+
+    @classmethod
+    def find_by_email(cls, email):
+        """
+        Case-insensitive lookup served by ix_users_lower_email.
+
+        Args:
+            email (str): Email address in any case
+
+        Returns:
+            User: Matching user or None
+        """
+        return cls.query.filter(db.func.lower(cls.email) == db.func.lower(email)).first()
+
+    # Identity cache
+    def to_snapshot(self):
+        """
+        Capture the loaded column values for the identity cache.
+
+        Returns:
+            dict: Column values keyed by attribute name
+        """
+        return {attr.key: getattr(self, attr.key) for attr in self.__mapper__.column_attrs}
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """
+        Rebuild a session-bound User from a cached snapshot without querying.
+        Validators are bypassed since the values came from the database.
+
+        Args:
+            snapshot (dict): Column values from to_snapshot
+
+        Returns:
+            User: User attached to the current session
+        """
+        user = cls.__mapper__.class_manager.new_instance()
+        for key, value in snapshot.items():
+            set_committed_value(user, key, value)
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+
     # Validations
     @validates("username")
     def validate_username(self, key, username):
@@ -170,4 +298,57 @@ class User(db.Model, SerializerMixin):
             if existing_user and existing_user.id != self.id:
                 raise ValueError("Email address is already in use.")
 
-        return email
\ No newline at end of file
+        return email
+
+
+@event.listens_for(User, "before_update")
+def bump_user_version(mapper, connection, target):
+    """
+    Bump the row version on every ORM update that changes a column.
+    Core UPDATEs against users bump it themselves.
+    """
+    if object_session(target).is_modified(target, include_collections=False):
+        target.version = User.version + 1
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def mark_cached_user_stale(mapper, connection, target):
+    """
+    Note the changed user so they are dropped from the identity cache once
+    the session commits.
+    """
+    object_session(target).info.setdefault("stale_user_ids", set()).add(target.id)
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def mark_user_list_stale(mapper, connection, target):
+    """
+    Flag the session so the user list cache is invalidated once it commits.
+    """
+    object_session(target).info["user_list_stale"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_user_list(session):
+    """
+    Invalidate cached users and user lists after a commit that changed them.
+    Waiting for the commit keeps a concurrent reader from caching the old rows.
+    """
+    for user_id in session.info.pop("stale_user_ids", ()):
+        user_cache.invalidate(user_id)
+    if session.info.pop("user_list_stale", False):
+        user_list_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_user_list_stale(session):
+    """
+    Forget pending invalidations. Changed users are still dropped, since a
+    read in this session may have cached their flushed, now rolled back, row.
+    """
+    for user_id in session.info.pop("stale_user_ids", ()):
+        user_cache.invalidate(user_id)
+    session.info.pop("user_list_stale", None)
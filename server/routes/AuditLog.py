@@ -0,0 +1,108 @@
+from setup import Resource, request, jwt_required, check_user_exists
+from models.AuditEvent import AuditEvent
+from services.Projection import Projection
+from sqlalchemy import tuple_
+from datetime import datetime
+import base64
+import json
+
+
+class AuditLog(Resource):
+    """
+    Resource for reading the audit trail, newest events first.
+    """
+
+    # Audit event fields to return
+    EVENT_FIELDS = ('id', 'created_at', 'actor_id', 'action', 'target_type', 'target_id', 'details')
+    EVENT_PROJECTION = Projection(AuditEvent, EVENT_FIELDS)
+
+    @jwt_required()
+    @check_user_exists
+    def get(self, user):
+        """
+        Get a page of audit events ordered by (created_at, id) descending.
+        Pages are keyset paginated so deep pages cost the same as the first.
+
+        Args:
+            user: User object (injected by check_user_exists decorator)
+
+        Query Parameters:
+            per_page: Number of items per page (default=50, max=500)
+            action: Optional action to filter by, e.g. user.update
+            actor_id: Optional ID of the user who performed the action
+            target_id: Optional ID of the affected record
+            cursor: next_cursor from the previous response
+
+        Returns:
+            200: Page of audit events with the next cursor
+            400: Invalid cursor
+        """
+        try:
+            per_page = min(max(request.args.get('per_page', 50, type=int), 1), 500)
+
+            query = AuditEvent.query
+            for field in ('action', 'actor_id', 'target_id'):
+                value = request.args.get(field)
+                if value:
+                    query = query.filter(getattr(AuditEvent, field) == value)
+
+            cursor = request.args.get('cursor')
+            if cursor:
+                try:
+                    created_at, event_id = self._decode_cursor(cursor)
+                except ValueError as e:
+                    return {'error': str(e)}, 400
+                query = query.filter(
+                    tuple_(AuditEvent.created_at, AuditEvent.id) < tuple_(created_at, event_id)
+                )
+
+            query = query.order_by(AuditEvent.created_at.desc(), AuditEvent.id.desc())
+
+            # Fetch one extra row to learn whether another page exists
+            rows = self.EVENT_PROJECTION.apply(query).limit(per_page + 1).all()
+            has_next = len(rows) > per_page
+            rows = rows[:per_page]
+
+            return {
+                'items': self.EVENT_PROJECTION.rows(rows),
+                'pagination': {
+                    'per_page': per_page,
+                    'has_next': has_next,
+                    'next_cursor': self._encode_cursor(rows[-1]) if has_next else None,
+                }
+            }, 200
+
+        except Exception as e:
+            return {'error': str(e)}, 500
+
+    def _encode_cursor(self, row):
+        """
+        Build an opaque cursor pointing at an audit event row.
+
+        Args:
+            row: Projected row the cursor points at
+
+        Returns:
+            str: URL-safe cursor
+        """
+        payload = {'c': row.created_at.isoformat(), 'i': row.id}
+        return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('utf-8')
+
+    def _decode_cursor(self, cursor):
+        """
+        Decode a cursor built by _encode_cursor.
+
+        Args:
+            cursor: Cursor string
+
+        Returns:
+            tuple: (created_at, id) of the last event on the previous page
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode('utf-8')))
+            return datetime.fromisoformat(payload['c']), int(payload['i'])
+        except Exception:
+            raise ValueError('Invalid cursor')
@@ -5,9 +5,14 @@ from setup import (
     get_jwt_identity,
     jwt_required,
     check_user_exists,
-    patch_if_exists
+    patch_if_exists,
+    PasswordHasherBusy,
+    audit_writer,
+    not_modified,
+    etag_header,
 )
 from models.User import User
+from services.Projection import Projection
 
 
 class UserById(Resource):
@@ -21,6 +26,7 @@ class UserById(Resource):
         "id", "username", "email", "status", 
         "last_name", "first_name", "start_date", 'locked', 'login_attempts'
     )
+    USER_PROJECTION = Projection(User, USER_FIELDS)
 
     @jwt_required()
     @check_user_exists
@@ -33,14 +39,26 @@ class UserById(Resource):
             id: User ID to retrieve
             
         Returns:
-            200: User details
+            200: User details with a strong ETag
+            304: Not modified (If-None-Match matched)
             404: User not found
         """
-        user = db.session.get(User, id)
-        if not user:
+        # Revalidations only need the version column
+        if request.if_none_match:
+            version = db.session.execute(
+                db.select(User.version).where(User.id == id)
+            ).scalar()
+            if version is not None and (response := not_modified(User.make_etag(id, version))):
+                return response
+
+        # row() ignores the trailing version column
+        row = db.session.execute(
+            self.USER_PROJECTION.select().add_columns(User.version).where(User.id == id)
+        ).first()
+        if not row:
             return {"error": "User not found"}, 404
             
-        return user.to_dict(only=self.USER_FIELDS), 200
+        return self.USER_PROJECTION.row(row), 200, etag_header(User.make_etag(id, row.version))
 
     @jwt_required()
     @check_user_exists
@@ -52,21 +70,41 @@ class UserById(Resource):
             current_user: User object (injected by check_user_exists decorator)
             id: User ID to update
             
+        Headers:
+            If-Match: (Optional) ETag from GET. The update only applies if the
+                user hasn't changed since; the row is locked while checking.
+            
         Returns:
-            200: Success
+            200: Success with the new ETag
             400: Invalid request or user not found
+            412: User changed since the If-Match ETag was issued
+            503: Password hashing pool is saturated
         """
             
         if not id:
             return {"error": "Invalid arguments"}, 400
 
-        user = db.session.get(User, id)
+        if_match = request.headers.get("If-Match")
+        # populate_existing: on a self-PATCH the identity map already holds the
+        # user check_user_exists built from user_cache, and its version may be stale
+        user = db.session.get(User, id, with_for_update=bool(if_match), populate_existing=True)
         if not user:
             return {"error": "User not found"}, 404
 
+        if if_match and not request.if_match.contains(user.etag):
+            db.session.rollback()
+            return {"error": "User was modified by someone else, reload and try again"}, 412
+
         try:
-            self._update_user(user, current_user, request.json)
-            return {"success": "User successfully updated"}, 200
+            changed = self._update_user(user, current_user, request.json)
+            audit_writer.record(
+                "user.update", actor_id=current_user.id, target_type="user",
+                target_id=user.id, details={"fields": changed}
+            )
+            return {"success": "User successfully updated"}, 200, etag_header(user.etag)
+        except PasswordHasherBusy as e:
+            db.session.rollback()
+            return {"error": str(e)}, 503
         except Exception as e:
             db.session.rollback()
             return {"error": str(e)}, 400
@@ -98,6 +136,7 @@ class UserById(Resource):
             # Log activity and delete the user
             db.session.delete(user)
             db.session.commit()
+            audit_writer.record("user.delete", actor_id=current_user.id, target_type="user", target_id=id)
             return {}, 204
         except Exception as e:
             db.session.rollback()
@@ -125,6 +164,10 @@ class UserById(Resource):
             current_user: Current authenticated user
             data: Update data dictionary
             
+        Returns:
+            list: Names of the fields that were set. Values are not returned
+                so passwords never reach the audit log.
+            
         Raises:
             Exception: If update fails
         """
@@ -134,17 +177,25 @@ class UserById(Resource):
             "first_name", "last_name"
         ]
         patch_if_exists(user_fields, data, user)
+        changed = [key for key in user_fields if data.get(key) is not None]
         
         # Handle account locking
         if 'locked' in data:
             user.locked = data['locked']
+            changed.append('locked')
             if not data['locked']:  # If unlocking, reset login attempts
                 user.login_attempts = 0
+            else:  # If locking, sign out every existing session
+                user.revoke_sessions()
             
         # Handle password update
         if 'password' in data and len(data['password']) >= 5:
             user.password = data['password']
+            user.revoke_sessions()
+            changed.append('password')
 
         
         # Commit the changes
-        db.session.commit()
\ No newline at end of file
+        db.session.commit()
+        
+        return changed
\ No newline at end of file
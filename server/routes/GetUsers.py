@@ -1,8 +1,82 @@
 
         
-from setup import Resource, db, request, jwt_required, get_jwt_identity, get_jwt, check_user_exists, check_not_none, uuid
+from setup import Resource, db, request, jwt_required, get_jwt_identity, get_jwt, check_user_exists, check_not_none, uuid, PasswordHasherBusy, Response, stream_with_context, password_hasher, current_time, audit_writer, not_modified, etag_header, user_list_cache
 from models.User import User
-from sqlalchemy import or_, func
+from services.UserSearch import get_user_search
+from services.Projection import Projection
+from sqlalchemy import func, tuple_, or_
+import hashlib
+import base64
+import json
+import csv
+import io
+
+
+SORT_FIELDS = ['id', 'username', 'email', 'status', 'first_name', 'last_name']
+
+
+def filter_users(args):
+    """
+    Build the filtered user query shared by the list and export endpoints.
+    
+    Args:
+        args: Request query parameters (search_term, user_ids, sort_by, sort_dir)
+        
+    Returns:
+        Tuple of (query, search_rank, sort_attr, sort_by, sort_dir)
+    """
+    # Get search term
+    search_term = args.get('search_term', '')
+    
+    # Get user IDs filter
+    user_ids_param = args.get('user_ids', '')
+    user_ids_filter = []
+    if user_ids_param:
+        user_ids_filter = [user_id.strip() for user_id in user_ids_param.split(',')]
+    
+    # Get sort parameters
+    sort_by = args.get('sort_by', 'username')
+    sort_dir = args.get('sort_dir', 'asc')
+    
+    # Base query
+    query = User.query
+    
+    # Apply user IDs filter if provided
+    if user_ids_filter:
+        query = query.filter(User.id.in_(user_ids_filter))
+    
+    # Apply search filter if provided (backend chosen from the DB dialect)
+    search_rank = None
+    if search_term:
+        query, search_rank = get_user_search(db.engine).filter(
+            query, User, search_term.lower()
+        )
+    
+    # Resolve sort column
+    if sort_by in SORT_FIELDS and hasattr(User, sort_by):
+        sort_attr = getattr(User, sort_by)
+    else:
+        # Default to username sorting
+        sort_attr = User.username
+        sort_by = 'username'
+    
+    return query, search_rank, sort_attr, sort_by, sort_dir
+
+
+def order_users(query, search_rank, sort_attr, sort_dir, args):
+    """
+    Apply relevance ordering to searches without an explicit sort_by,
+    otherwise order by the sort column.
+    
+    Returns:
+        Query: Ordered query
+    """
+    if search_rank is not None and 'sort_by' not in args:
+        return query.order_by(search_rank.desc(), User.id.asc())
+    elif sort_dir == 'asc':
+        return query.order_by(sort_attr.asc())
+    else:
+        return query.order_by(sort_attr.desc())
 
 
 class Users(Resource):
@@ -10,6 +84,17 @@ class Users(Resource):
     Resource for managing user accounts.
     Provides endpoints to list and create users in the system.
     """
+
+    # User fields to return
+    USER_FIELDS = (
+        'id', 'username', 'first_name', 'last_name', 'start_date',
+        'status',
+        'email', 'locked', 'login_attempts'
+    )
+    USER_PROJECTION = Projection(User, USER_FIELDS)
+
+    # Columns that may be NULL are coalesced so keyset comparisons stay total
+    NULLABLE_SORT_FIELDS = ('email', 'status', 'first_name', 'last_name')
     
     @jwt_required()
     @check_user_exists
@@ -24,104 +109,227 @@ class Users(Resource):
         Query Parameters:
             page: Page number (default=1)
             per_page: Number of items per page (default=10)
-            search_term: Optional search term to filter users
+            search_term: Optional search term to filter users. Results are
+                ordered by relevance unless sort_by is given.
             user_ids: Optional comma-separated list of user IDs to filter by
             sort_by: Field to sort by (default=username)
             sort_dir: Sort direction (asc or desc, default=asc)
+            cursor: Opt-in keyset pagination. Pass an empty value for the first
+                page, then the next_cursor/prev_cursor from the previous response.
+                page is ignored and no counts are returned in this mode.
             
         Returns:
-            200: Paginated list of users with metadata
+            200: Paginated list of users with metadata and a weak ETag
+            304: Not modified (If-None-Match matched)
+            400: Invalid cursor
         """
         
         try:
-            # Get pagination parameters
-            page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
+            # Identical list requests share one cached, already serialized result
+            body, status, etag = user_list_cache.get_or_compute(
+                self._cache_key(request.args),
+                lambda: self._list_users(request.args),
+                cacheable=lambda result: result[1] == 200,
+            )
+        except Exception as e:
+            return {'error': str(e)}, 500
 
-            # Get search term
-            search_term = request.args.get('search_term', '')
-            
+        if status != 200:
+            return body, status
+        if response := not_modified(etag, weak=True):
+            return response
+        return body, 200, etag_header(etag, weak=True)
 
+    def _cache_key(self, args):
+        """
+        Normalize list parameters so equivalent requests share a cache entry.
+        
+        Args:
+            args: Request query parameters
             
-            # Get user IDs filter
-            user_ids_param = request.args.get('user_ids', '')
-            user_ids_filter = []
-            if user_ids_param:
-                user_ids_filter = [user_id.strip() for user_id in user_ids_param.split(',')]
-            
-            # Get sort parameters
-            sort_by = request.args.get('sort_by', 'username')
-            sort_dir = request.args.get('sort_dir', 'asc')
+        Returns:
+            tuple: Hashable cache key
+        """
+        user_ids = sorted(filter(None, (user_id.strip() for user_id in args.get('user_ids', '').split(','))))
+        return (
+            args.get('page', 1, type=int),
+            args.get('per_page', 10, type=int),
+            args.get('search_term', '').lower(),
+            ','.join(user_ids),
+            args.get('sort_by'),
+            args.get('sort_dir', 'asc'),
+            args.get('cursor'),
+        )
+
+    def _list_users(self, args):
+        """
+        Run the list query and serialize one page.
+        
+        Args:
+            args: Request query parameters
             
-            # User fields to return 
-            user_fields = (
-                'id', 'username', 'first_name', 'last_name', 'start_date', 
-                'status',
-                'email', 'locked', 'login_attempts'
+        Returns:
+            Tuple of (response_data, status_code, etag)
+        """
+        # Get pagination parameters
+        page = args.get('page', 1, type=int)
+        per_page = args.get('per_page', 10, type=int)
+
+        # Apply filters
+        query, search_rank, sort_attr, sort_by, sort_dir = filter_users(args)
+        
+        # Keyset pagination mode
+        if 'cursor' in args:
+            return self._keyset_page(
+                query, sort_attr, sort_by, sort_dir,
+                args.get('cursor'), per_page
             )
+        
+        # Apply sorting
+        query = order_users(query, search_rank, sort_attr, sort_dir, args)
+        
+        # Apply pagination, loading only the returned columns plus the
+        # row versions for the ETag (row() ignores the trailing column)
+        paginated_users = self.USER_PROJECTION.apply(query).add_columns(User.version).paginate(page=page, per_page=per_page)
+        
+        # Serialize users
+        results = self.USER_PROJECTION.rows(paginated_users.items)
+        
+        # Prepare pagination metadata
+        pagination = {
+            'total_items': paginated_users.total,
+            'total_pages': paginated_users.pages,
+            'current_page': page,
+            'per_page': per_page,
+            'has_prev': paginated_users.has_prev,
+            'has_next': paginated_users.has_next
+        }
+        
+        return {
+            'items': results,
+            'pagination': pagination
+        }, 200, self._page_etag(paginated_users.items, paginated_users.total)
+
+    def _page_etag(self, rows, *extra):
+        """
+        Build a weak ETag for a page from each row's (id, version) and the
+        page metadata, so edits, inserts, deletes and reorders all change it.
+        
+        Args:
+            rows: Page rows including the version column
+            *extra: Page metadata such as the total count
             
-            # Base query
-            query = User.query
-            
-            
-            # Apply user IDs filter if provided
-            if user_ids_filter:
-                query = query.filter(User.id.in_(user_ids_filter))
-            
-            # Apply search filter if provided
-            if search_term:
-                search_term_lower = search_term.lower()
-                query = query.filter(
-                    or_(
-                        func.lower(User.username).contains(search_term_lower),
-                        func.lower(User.email).contains(search_term_lower),
-                        func.lower(User.id).contains(search_term_lower),
-                        func.lower(User.first_name).contains(search_term_lower),
-                        func.lower(User.last_name).contains(search_term_lower),
-                    )
-                )
+        Returns:
+            str: Unquoted ETag value
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for row in rows:
+            digest.update(f"{row.id}:{row.version};".encode('utf-8'))
+        digest.update(repr(extra).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _encode_cursor(self, user_obj, sort_by, sort_dir, backwards=False):
+        """
+        Build an opaque cursor pointing at a user row.
+        
+        Args:
+            user_obj: User row the cursor points at
+            sort_by: Sort field the cursor is valid for
+            sort_dir: Sort direction the cursor is valid for
+            backwards: True if the cursor fetches the previous page
             
-            # Count total items before pagination
-            total_items = query.count()
+        Returns:
+            str: URL-safe cursor
+        """
+        value = getattr(user_obj, sort_by)
+        if sort_by in self.NULLABLE_SORT_FIELDS and value is None:
+            value = ''
+        payload = {'s': sort_by, 'd': sort_dir, 'v': value, 'i': user_obj.id, 'b': backwards}
+        return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('utf-8')
+
+    def _decode_cursor(self, cursor):
+        """
+        Decode a cursor built by _encode_cursor.
+        
+        Args:
+            cursor: Cursor string
             
-            # Apply sorting
-            if sort_by in ['id', 'username', 'email', 'status', 'first_name', 'last_name'] and hasattr(User, sort_by):
-                sort_attr = getattr(User, sort_by)
-            else:
-                # Default to username sorting
-                sort_attr = User.username
+        Returns:
+            dict: Cursor payload
             
-            if sort_dir == 'asc':
-                query = query.order_by(sort_attr.asc())
-            else:
-                query = query.order_by(sort_attr.desc())
-            
-            # Apply pagination
-            paginated_users = query.paginate(page=page, per_page=per_page)
-            
-            # Serialize users
-            results = []
-            for user_obj in paginated_users.items:
-                user_dict = user_obj.to_dict(only=user_fields)
-                results.append(user_dict)
-            
-            # Prepare pagination metadata
-            pagination = {
-                'total_items': total_items,
-                'total_pages': paginated_users.pages,
-                'current_page': page,
-                'per_page': per_page,
-                'has_prev': paginated_users.has_prev,
-                'has_next': paginated_users.has_next
-            }
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode('utf-8')))
+            if not {'s', 'd', 'v', 'i', 'b'} <= payload.keys():
+                raise ValueError
+            return payload
+        except Exception:
+            raise ValueError('Invalid cursor')
+
+    def _keyset_page(self, query, sort_attr, sort_by, sort_dir, cursor, per_page):
+        """
+        Fetch one page ordered by (sort column, id) starting after a cursor.
+        Deep pages cost the same as the first and no count queries are issued.
+        
+        Args:
+            query: Filtered user query
+            sort_attr: Column to sort by
+            sort_by: Name of the sort column
+            sort_dir: Sort direction (asc or desc)
+            cursor: Cursor from a previous response, empty for the first page
+            per_page: Number of items per page
             
-            return {
-                'items': results,
-                'pagination': pagination
-            }, 200
+        Returns:
+            Tuple of (response_data, status_code, etag)
+        """
+        sort_key = func.coalesce(sort_attr, '') if sort_by in self.NULLABLE_SORT_FIELDS else sort_attr
+        backwards = False
+        
+        if cursor:
+            try:
+                position = self._decode_cursor(cursor)
+            except ValueError as e:
+                return {'error': str(e)}, 400, None
             
-        except Exception as e:
-            return {'error': str(e)}, 500
+            if position['s'] != sort_by or position['d'] != sort_dir:
+                return {'error': 'Cursor does not match sort_by/sort_dir'}, 400, None
+            
+            backwards = position['b']
+            # Ascending forward and descending backward both walk up the index
+            if (sort_dir == 'asc') != backwards:
+                query = query.filter(tuple_(sort_key, User.id) > tuple_(position['v'], position['i']))
+            else:
+                query = query.filter(tuple_(sort_key, User.id) < tuple_(position['v'], position['i']))
+        
+        if (sort_dir == 'asc') != backwards:
+            query = query.order_by(sort_key.asc(), User.id.asc())
+        else:
+            query = query.order_by(sort_key.desc(), User.id.desc())
+        
+        # Fetch one extra row to learn whether another page exists
+        rows = self.USER_PROJECTION.apply(query).add_columns(User.version).limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        if backwards:
+            rows.reverse()
+        
+        has_next = has_more if not backwards else True
+        has_prev = has_more if backwards else bool(cursor)
+        
+        pagination = {
+            'per_page': per_page,
+            'has_prev': has_prev and bool(rows),
+            'has_next': has_next and bool(rows),
+            'next_cursor': self._encode_cursor(rows[-1], sort_by, sort_dir) if has_next and rows else None,
+            'prev_cursor': self._encode_cursor(rows[0], sort_by, sort_dir, backwards=True) if has_prev and rows else None,
+        }
+        
+        return {
+            'items': self.USER_PROJECTION.rows(rows),
+            'pagination': pagination
+        }, 200, self._page_etag(rows, pagination['has_prev'], pagination['has_next'])
         
     @jwt_required()
     @check_user_exists
@@ -145,6 +353,7 @@ class Users(Resource):
         Returns:
             201: Success with user ID
             400: Invalid request
+            503: Password hashing pool is saturated
         """
         
         
@@ -179,6 +388,9 @@ class Users(Resource):
                 user, id, username, password,
                 start_date, email, status, last_name, first_name
             )
+        except PasswordHasherBusy as e:
+            db.session.rollback()
+            return {'error': str(e)}, 503
         except Exception as e:
             db.session.rollback()
             return {'error': str(e)}, 400
@@ -230,4 +442,329 @@ class Users(Resource):
         # Commit all changes
         db.session.commit()
         
-        return {'success': user.id}, 201
\ No newline at end of file
+        audit_writer.record('user.create', actor_id=current_user.id, target_type='user', target_id=user.id)
+        
+        return {'success': user.id}, 201
+
+class UserExport(Resource):
+    """
+    Resource for exporting the full user directory.
+    Streams every matching user as NDJSON or CSV in constant memory.
+    """
+    
+    # Fields to export
+    USER_PROJECTION = Users.USER_PROJECTION
+    
+    # Rows fetched per round-trip from the server-side cursor
+    BATCH_SIZE = 1000
+    
+    FORMATS = {
+        'ndjson': 'application/x-ndjson',
+        'csv': 'text/csv',
+    }
+    
+    @jwt_required()
+    @check_user_exists
+    def get(self, user):
+        """
+        Stream all users matching the same filters as GET /users.
+        
+        Args:
+            user: User object (injected by check_user_exists decorator)
+            
+        Query Parameters:
+            format: ndjson or csv (default=ndjson)
+            search_term: Optional search term to filter users
+            user_ids: Optional comma-separated list of user IDs to filter by
+            sort_by: Field to sort by (default=username)
+            sort_dir: Sort direction (asc or desc, default=asc)
+            
+        Returns:
+            200: Streamed NDJSON or CSV body
+            400: Unknown format
+        """
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in self.FORMATS:
+            return {'error': 'format must be ndjson or csv'}, 400
+        
+        query, search_rank, sort_attr, sort_by, sort_dir = filter_users(request.args)
+        query = order_users(query, search_rank, sort_attr, sort_dir, request.args)
+        
+        # yield_per streams rows through a server-side cursor where supported
+        rows = self.USER_PROJECTION.apply(query).yield_per(self.BATCH_SIZE)
+        
+        if export_format == 'csv':
+            body = self._csv_lines(rows)
+        else:
+            body = self._ndjson_lines(rows)
+        
+        return Response(
+            stream_with_context(body),
+            mimetype=self.FORMATS[export_format],
+            headers={'Content-Disposition': f'attachment; filename=users.{export_format}'},
+        )
+    
+    def _ndjson_lines(self, rows):
+        """
+        Yield one JSON document per user, flushing a batch at a time.
+        """
+        chunk = []
+        for row in rows:
+            chunk.append(json.dumps(self.USER_PROJECTION.row(row)))
+            if len(chunk) >= self.BATCH_SIZE:
+                yield '\n'.join(chunk) + '\n'
+                chunk = []
+        if chunk:
+            yield '\n'.join(chunk) + '\n'
+    
+    def _csv_lines(self, rows):
+        """
+        Yield a CSV header followed by user rows, flushing a batch at a time.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.USER_PROJECTION.fields)
+        
+        count = 0
+        for row in rows:
+            writer.writerow(self.USER_PROJECTION.row(row).values())
+            count += 1
+            if count % self.BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+
+class UserImport(Resource):
+    """
+    Resource for bulk user creation.
+    Accepts a JSON array or a CSV upload and reports the outcome per row.
+    """
+    
+    # Columns accepted per row
+    IMPORT_FIELDS = (
+        'id', 'username', 'password', 'start_date',
+        'email', 'first_name', 'last_name', 'status'
+    )
+    
+    # Rows checked, hashed and inserted together
+    BATCH_SIZE = 1000
+    MAX_ROWS = 50000
+    
+    @jwt_required()
+    @check_user_exists
+    def post(self, user):
+        """
+        Create many users at once.
+        
+        Args:
+            user: User object (injected by check_user_exists decorator)
+            
+        Body:
+            JSON array of user objects, a text/csv body, or a multipart
+            upload with a CSV "file". Rows use the same fields as POST /users.
+            
+        Returns:
+            200: Per-row report with created/failed counts
+            400: Unreadable body or too many rows
+            503: Password hashing pool is saturated
+        """
+        try:
+            rows = self._read_rows()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        
+        if len(rows) > self.MAX_ROWS:
+            return {'error': f'At most {self.MAX_ROWS} rows can be imported at once'}, 400
+        
+        results = []
+        try:
+            for start in range(0, len(rows), self.BATCH_SIZE):
+                results.extend(self._import_batch(rows[start:start + self.BATCH_SIZE], start))
+        except PasswordHasherBusy as e:
+            db.session.rollback()
+            self._audit_created(user, results)
+            return {'error': str(e), 'results': results}, 503
+        
+        created = self._audit_created(user, results)
+        return {
+            'created': created,
+            'failed': len(results) - created,
+            'results': results
+        }, 200
+    
+    def _audit_created(self, current_user, results):
+        """
+        Record an audit event for every created row.
+        
+        Returns:
+            int: Number of created rows
+        """
+        created = 0
+        for result in results:
+            if result['status'] == 'created':
+                created += 1
+                audit_writer.record(
+                    'user.create', actor_id=current_user.id, target_type='user',
+                    target_id=result['id'], details={'source': 'import'}
+                )
+        return created
+    
+    def _read_rows(self):
+        """
+        Parse the request body into a list of row dicts.
+        
+        Raises:
+            ValueError: If the body is neither a JSON array nor CSV
+        """
+        upload = request.files.get('file')
+        if upload is not None:
+            return list(csv.DictReader(io.StringIO(upload.read().decode('utf-8-sig'))))
+        
+        if request.mimetype == 'text/csv':
+            return list(csv.DictReader(io.StringIO(request.get_data(as_text=True))))
+        
+        data = request.get_json(silent=True)
+        if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+            raise ValueError('Expected a JSON array of users or a CSV upload')
+        return data
+    
+    def _validate_row(self, row):
+        """
+        Apply the same checks as POST /users and the User validators.
+        
+        Returns:
+            str: Error message, or None if the row is valid
+        """
+        id = row.get('id')
+        username = row.get('username')
+        password = row.get('password')
+        
+        if not check_not_none(id, username) or not id or not username:
+            return 'Missing required fields'
+        # JSON rows can carry numbers, lists or objects where text is expected
+        for key in self.IMPORT_FIELDS:
+            if key != 'id' and row.get(key) is not None and not isinstance(row[key], str):
+                return f'{key} must be a string'
+        if not str(id).isdigit():
+            return 'User ID must only contain numbers'
+        if len(username) < 5:
+            return 'Username must be at least 5 characters long.'
+        if password is not None and len(password) < 5:
+            return 'Password must be at least 5 characters long.'
+        return None
+    
+    def _import_batch(self, batch, offset):
+        """
+        Check conflicts with one query, hash passwords in parallel and insert
+        the valid rows with a single executemany.
+        
+        Args:
+            batch: List of row dicts
+            offset: Index of the first row in the whole import
+            
+        Returns:
+            list: Result dict per row
+        """
+        results = [None] * len(batch)
+        candidates = []
+        seen_ids, seen_usernames, seen_emails = set(), set(), set()
+        
+        for index, raw in enumerate(batch):
+            row = {key: (raw.get(key) or None) for key in self.IMPORT_FIELDS}
+            if row['id'] is not None:
+                row['id'] = str(row['id']).strip()
+            
+            error = self._validate_row(row)
+            if not error:
+                username_key = row['username'].lower()
+                email_key = row['email'].lower() if row['email'] else None
+                if row['id'] in seen_ids:
+                    error = 'Duplicate ID in import'
+                elif username_key in seen_usernames:
+                    error = 'Duplicate username in import'
+                elif email_key and email_key in seen_emails:
+                    error = 'Duplicate email in import'
+                else:
+                    seen_ids.add(row['id'])
+                    seen_usernames.add(username_key)
+                    if email_key:
+                        seen_emails.add(email_key)
+            
+            if error:
+                results[index] = {'row': offset + index, 'id': row['id'], 'status': 'error', 'error': error}
+            else:
+                candidates.append((index, row))
+        
+        if candidates:
+            # One set-based lookup for every conflict in the batch
+            existing = db.session.query(
+                User.id, func.lower(User.username), func.lower(User.email)
+            ).filter(or_(
+                User.id.in_(seen_ids),
+                func.lower(User.username).in_(seen_usernames),
+                func.lower(User.email).in_(seen_emails),
+            )).all()
+            taken_ids = {row[0] for row in existing}
+            taken_usernames = {row[1] for row in existing}
+            taken_emails = {row[2] for row in existing if row[2]}
+            
+            valid = []
+            for index, row in candidates:
+                if row['id'] in taken_ids:
+                    error = 'A user with that ID already exists'
+                elif row['username'].lower() in taken_usernames:
+                    error = 'Username is taken.'
+                elif row['email'] and row['email'].lower() in taken_emails:
+                    error = 'Email address is already in use.'
+                else:
+                    valid.append((index, row))
+                    continue
+                results[index] = {'row': offset + index, 'id': row['id'], 'status': 'error', 'error': error}
+            
+            if valid:
+                self._insert(valid, offset, results)
+        
+        return results
+    
+    def _insert(self, valid, offset, results):
+        """
+        Hash passwords on the hashing pool and insert rows with executemany.
+        """
+        passwords = [row['password'] or str(uuid.uuid4())[:8] for _, row in valid]
+        hashes = password_hasher.hash_many(passwords)
+        now = current_time()
+        
+        records = [
+            {
+                'id': row['id'],
+                'username': row['username'],
+                'password_hash': password_hash,
+                'email': row['email'],
+                'first_name': row['first_name'],
+                'last_name': row['last_name'],
+                'start_date': row['start_date'],
+                'status': row['status'] or 'Active',
+                'locked': False,
+                'login_attempts': 0,
+                'created_at': now,
+                'last_login': now,
+            }
+            for (_, row), password_hash in zip(valid, hashes)
+        ]
+        
+        try:
+            db.session.execute(User.__table__.insert(), records)
+            db.session.commit()
+            # Core inserts skip the User mapper events
+            user_list_cache.invalidate()
+        except Exception:
+            # A concurrent insert won a race, report the whole batch
+            db.session.rollback()
+            for index, row in valid:
+                results[index] = {'row': offset + index, 'id': row['id'], 'status': 'error', 'error': 'Conflict while inserting batch, please retry'}
+            return
+        
+        for index, row in valid:
+            results[index] = {'row': offset + index, 'id': row['id'], 'status': 'created'}
@@ -8,16 +8,22 @@ from setup import (
     create_refresh_token,
     set_access_cookies,
     set_refresh_cookies,
-    resend,
+    email_worker,
+    auth_code_store,
+    login_activity,
     check_not_none,
     BYPASS_2FA,
     PROD,
     current_time,
     load_dotenv,
     datetime,
+    PasswordHasherBusy,
+    rate_limit,
+    rate_limiter,
 )
 from models.User import User
-from models.AuthCode import AuthCode
+from models.EmailOutbox import EmailOutbox
+from services.Projection import Projection
 
 
 
@@ -27,6 +33,9 @@ class Login(Resource):
     Provides endpoints for login with optional 2FA.
     """
 
+    # Fields to return after a successful login
+    USER_PROJECTION = Projection(User, ("id", "username",))
+
     def post(self):
         """
         Process login request with username/password or 2FA code.
@@ -40,7 +49,9 @@ class Login(Resource):
             200: User details with access and refresh tokens as cookies
             400: Invalid request or authentication error
             404: User not found
+            429: Rate limit exceeded
             500: Server error during 2FA processing
+            503: Password hashing pool is saturated
         """
         load_dotenv()
 
@@ -62,10 +73,12 @@ class Login(Resource):
                 "error": "Username and password must be between 5 and 25 characters"
             }, 400
 
+        # Reject floods before the user lookup and bcrypt run
+        if limited := rate_limit(login_ip=request.remote_addr, login_user=username.lower()):
+            return limited
+
         # Lookup user by username (case-insensitive)
-        user = User.query.filter(
-            db.func.lower(User.username) == db.func.lower(username)
-        ).first()
+        user = User.find_by_username(username)
 
         if not user:
             return {"error": "User not found"}, 404
@@ -74,19 +87,22 @@ class Login(Resource):
             return {"error": "Account is locked"}, 400
 
         # Verify password
-        if not user.authenticate(password):
-            return {"error": "Invalid password"}, 400
+        try:
+            if not user.authenticate(password):
+                return {"error": "Invalid password"}, 400
+        except PasswordHasherBusy as e:
+            return {"error": str(e)}, 503
         
-        user.last_login = current_time()
-
         # Check if 2FA can be bypassed (development only)
         if not PROD:
             # Reset rate limit on successful login
+            rate_limiter.reset("login_user", username.lower())
             return self._complete_login(user)
 
         # Process 2FA if user has email
         if user.email:
             # Reset initial login rate limit since credentials were valid
+            rate_limiter.reset("login_user", username.lower())
             return self._send_2fa_code(user)
         else:
             return {
@@ -105,19 +121,25 @@ class Login(Resource):
             400: Invalid or expired code
             429: Rate limit exceeded
         """
+        # Codes are short, so guessing is limited per client
+        if limited := rate_limit(login_code_ip=request.remote_addr):
+            return limited
 
-        auth_code = db.session.get(AuthCode, code)
-        if not auth_code:
+        # Load the code and its user together
+        user, expired = auth_code_store.lookup_user(code)
+        if expired is None:
             return {"error": "Invalid 2FA code"}, 400
 
-        if auth_code.is_expired:
+        if expired:
             return {"error": "Your auth code has expired"}, 400
 
-        # Get the user associated with the code
-        user = auth_code.user
+        if not user:
+            return {"error": "User not found"}, 404
 
-        # Delete the used auth code
-        db.session.delete(auth_code)
+        # Delete the used auth code. Only the request that actually removed it may log in
+        if not auth_code_store.consume(code):
+            db.session.rollback()
+            return {"error": "Invalid 2FA code"}, 400
         db.session.commit()
 
         # Complete the login process
@@ -125,7 +147,8 @@ class Login(Resource):
 
     def _send_2fa_code(self, user):
         """
-        Generate and send a 2FA code to the user's email.
+        Generate a 2FA code and queue it for the user's email.
+        The code and the outbox row are committed together.
 
         Args:
             user: User object to send 2FA code to
@@ -133,25 +156,18 @@ class Login(Resource):
         Returns:
             200: Success message
             429: Rate limit exceeded
-            500: Error sending email
+            500: Error queueing email
         """
 
         try:
-            # Delete all pre-existing 2FA codes for this user
-            for code in AuthCode.query.filter(AuthCode.email == user.email).all():
-                db.session.delete(code)
-
-            # Create a new 2FA code
-            new_2fa_code = AuthCode(email=user.email)
-            db.session.add(new_2fa_code)
-            db.session.commit()
-
-            # Send the code via email
-            params = {
-                "from": "Admin <Administrator@templatesite.app>",
-                "to": [user.email],
-                "subject": "2FA Code",
-                "html": f"""
+            # Replace any pre-existing 2FA codes for this user with a new one
+            new_2fa_code = auth_code_store.issue(user.email, user_id=user.id)
+
+            # Queue the code email in the same transaction
+            EmailOutbox.enqueue(
+                recipient=user.email,
+                subject="2FA Code",
+                html=f"""
             <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #e0e0e0; border-radius: 5px;">
                 <div style="text-align: center; margin-bottom: 20px;">
                     <h2 style="color: #4a6cf7;">Template Site Authentication</h2>
@@ -162,7 +178,7 @@ class Login(Resource):
                 <p style="margin-bottom: 30px;">We received a request to log in to your account. Please use the verification code below to complete your login:</p>
                 
                 <div style="background-color: #f8fafc; border: 1px solid #e2e8f0; border-radius: 5px; padding: 20px; text-align: center; font-size: 28px; letter-spacing: 5px; margin: 30px 0; font-weight: bold;">
-                    {new_2fa_code.id}
+                    {new_2fa_code}
                 </div>
                 
                 <p style="margin-top: 30px;">This code will expire in 10 minutes. If you did not request this code, please ignore this email or contact support if you have concerns.</p>
@@ -173,8 +189,9 @@ class Login(Resource):
                 </div>
             </div>
             """,
-            }
-            resend.Emails.send(params)
+            )
+            db.session.commit()
+            email_worker.notify()
 
             return {"success": "2FA"}, 200
         except Exception as e:
@@ -184,6 +201,7 @@ class Login(Resource):
     def _complete_login(self, user):
         """
         Complete the login process by creating tokens and logging the activity.
+        last_login and the activity row are written in the background.
 
         Args:
             user: User object to log in
@@ -191,27 +209,34 @@ class Login(Resource):
         Returns:
             200: User details with access/refresh tokens
         """
-        # Create access and refresh tokens
+        # Create access and refresh tokens. They carry the user's token
+        # version so revoking all sessions only needs a version bump
+        claims = {"ver": user.token_version}
         access_token = create_access_token(
             identity=user.id,
+            additional_claims=claims,
             expires_delta=timedelta(hours=1),
         )
         refresh_token = create_refresh_token(
             identity=user.id,
+            additional_claims=claims,
             expires_delta=timedelta(days=30),
         )
 
         # Create response with user details
         response = make_response(
-            user.to_dict(
-                only=(
-                    "id",
-                    "username",
-                )
-            ),
+            self.USER_PROJECTION.obj(user),
             200,
         )
 
+        # Record the login without waiting on the write
+        login_activity.record_login(
+            user.id,
+            current_time(),
+            ip_address=request.remote_addr,
+            user_agent=request.headers.get("User-Agent"),
+        )
+
         # Set auth cookies
         set_access_cookies(response, access_token)
         set_refresh_cookies(response, refresh_token)
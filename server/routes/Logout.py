@@ -1,4 +1,4 @@
-from setup import Resource, make_response, unset_access_cookies, unset_refresh_cookies, jwt_required, get_jwt_identity
+from setup import Resource, app, request, make_response, unset_access_cookies, unset_refresh_cookies, jwt_required, get_jwt_identity, get_jwt, decode_token, revoke_token
 from models.User import User
 from setup import db, check_user_exists
 
@@ -13,13 +13,24 @@ class Logout(Resource):
     @check_user_exists
     def delete(self, user):
         """
-        Log out the current authenticated user by clearing cookies.
+        Log out the current authenticated user by revoking their access and
+        refresh tokens and clearing cookies.
         
         Returns:
             204: No content with cleared cookies
         """
         try:
             
+            # Revoke the access token and, if present, the refresh token
+            revoke_token(get_jwt())
+            refresh_cookie = request.cookies.get(app.config.get('JWT_REFRESH_COOKIE_NAME', 'refresh_token_cookie'))
+            if refresh_cookie:
+                try:
+                    revoke_token(decode_token(refresh_cookie))
+                except Exception:
+                    # An expired or invalid refresh token can't be used anyway
+                    pass
+            
             # Create response and clear cookies
             response = make_response({}, 204)
             unset_access_cookies(response)
@@ -30,8 +41,9 @@ class Logout(Resource):
         except Exception as e:
             # If there's an error during logout, still clear cookies
             # but return a 200 status code with error info
+            db.session.rollback()
             response = make_response({"error": str(e)}, 200)
             unset_access_cookies(response)
             unset_refresh_cookies(response)
             
-            return response
\ No newline at end of file
+            return response
@@ -1,6 +1,7 @@
 from flask import request
-from setup import Resource, jwt_required, check_user_exists, db
+from setup import Resource, jwt_required, check_user_exists, db, not_modified, etag_header
 from models.User import User
+from services.Projection import Projection
 
 
 class MyUser(Resource):
@@ -13,6 +14,7 @@ class MyUser(Resource):
     USER_FIELDS = (
         "id", "username",
     )
+    USER_PROJECTION = Projection(User, USER_FIELDS)
     
     @jwt_required()
     @check_user_exists
@@ -24,8 +26,13 @@ class MyUser(Resource):
             user: User object (injected by check_user_exists decorator)
             
         Returns:
-            200: User details
+            200: User details with a strong ETag
+            304: Not modified (If-None-Match matched)
         """
+        # The user usually comes from the identity cache, so a 304 costs no query
+        if response := not_modified(user.etag):
+            return response
+
         # Return user details
-        return user.to_dict(only=self.USER_FIELDS), 200
+        return self.USER_PROJECTION.obj(user), 200, etag_header(user.etag)
         
@@ -1,5 +1,6 @@
-from setup import db, Resource, make_response, create_access_token, jwt_required, set_access_cookies, get_jwt_identity, check_user_exists
+from setup import db, Resource, make_response, create_access_token, jwt_required, set_access_cookies, get_jwt_identity, get_jwt, check_user_exists
 from models.User import User
+from services.Projection import Projection
 
 
 class RefreshToken(Resource):
@@ -8,6 +9,9 @@ class RefreshToken(Resource):
     Provides an endpoint to refresh the user's access token.
     """
     
+    # Fields to return in the response
+    USER_PROJECTION = Projection(User, ('id', 'username',))
+    
     @jwt_required(refresh=True)
     @check_user_exists
     def post(self, user):
@@ -22,12 +26,16 @@ class RefreshToken(Resource):
             500: Server error
         """
         try:
-            # Create a new access token
-            new_access_token = create_access_token(identity=user.id)
+            # Create a new access token. The refresh token's "ver" was just
+            # checked against the database, unlike the cached user's
+            new_access_token = create_access_token(
+                identity=user.id,
+                additional_claims={"ver": get_jwt().get("ver", 0)},
+            )
             
             # Create response with user details
             response = make_response(
-                user.to_dict(only=('id', 'username',)), 
+                self.USER_PROJECTION.obj(user), 
                 200
             )
             
@@ -4,12 +4,16 @@ from setup import (
     request,
     jwt_required,
     check_not_none,
-    resend,
+    email_worker,
+    auth_code_store,
     load_dotenv,
     os,
+    PasswordHasherBusy,
+    audit_writer,
+    rate_limit,
 )
 from models.User import User
-from models.AuthCode import AuthCode
+from models.EmailOutbox import EmailOutbox
 
 
 class ResetPassword(Resource):
@@ -33,8 +37,15 @@ class ResetPassword(Resource):
             200: Success
             400: Invalid request
             404: User not found
+            429: Rate limit exceeded
             500: Server error
         """
+        email = (request.json or {}).get("email") if reset_code == "send" else None
+        if limited := rate_limit(
+            reset_ip=request.remote_addr,
+            reset_email=email.lower() if isinstance(email, str) else None,
+        ):
+            return limited
 
         if reset_code == "send":
             return self._send_reset_email()
@@ -43,7 +54,8 @@ class ResetPassword(Resource):
 
     def _send_reset_email(self):
         """
-        Send password reset email to user.
+        Queue a password reset email for the user.
+        The reset code and the outbox row are committed together.
 
         Returns:
             200: Success
@@ -57,19 +69,13 @@ class ResetPassword(Resource):
             return {"error": "Please include an email"}, 400
 
         try:
-            user_account = User.query.filter(
-                db.func.lower(User.email) == db.func.lower(email)
-            ).first()
+            user_account = User.find_by_email(email)
 
             if not user_account:
                 return {"error": "User with that email does not exist"}, 404
 
             # Create reset code
-            reset_link = AuthCode(email=user_account.email)
-            db.session.add(reset_link)
-
-
-            db.session.commit()
+            reset_code = auth_code_store.issue(user_account.email, replace=False, user_id=user_account.id)
 
             # Load environment variables
             load_dotenv()
@@ -77,7 +83,7 @@ class ResetPassword(Resource):
 
             # Build reset URL
             base_url = "http://127.0.0.1:3000"
-            reset_url = f"{base_url}/reset_password/{reset_link.id}"
+            reset_url = f"{base_url}/reset_password/{reset_code}"
 
             html_template = """ 
             <!DOCTYPE html>
@@ -187,14 +193,14 @@ class ResetPassword(Resource):
             </html>
             """
 
-            # Send email
-            params = {
-                "from": "Admin <Administrator@templatesite.app>",
-                "to": [user_account.email],
-                "subject": "Template Site Password Reset",
-                "html": html_template,
-            }
-            resend.Emails.send(params)
+            # Queue email in the same transaction as the reset code
+            EmailOutbox.enqueue(
+                recipient=user_account.email,
+                subject="Template Site Password Reset",
+                html=html_template,
+            )
+            db.session.commit()
+            email_worker.notify()
 
             return {"success": True}, 200
 
@@ -213,39 +219,54 @@ class ResetPassword(Resource):
             200: Success
             400: Invalid request or expired code
             500: Server error
+            503: Password hashing pool is saturated
         """
         password = request.json.get("password")
 
         if not check_not_none(password):
             return {"error": "Please include a password"}, 400
 
+        consumed = False
         try:
-            reset = db.session.get(AuthCode, reset_code)
+            # Load the code and its user together
+            user_account, expired = auth_code_store.lookup_user(reset_code)
 
-            if not reset:
+            if expired is None:
                 return {"error": "Invalid reset code"}, 400
 
-            if reset.is_expired:
+            if expired:
                 return {"error": "Your auth code has expired"}, 400
 
-            user_account = User.query.filter(
-                db.func.lower(User.email) == db.func.lower(reset.email)
-            ).first()
-
             if not user_account:
                 return {"error": "User not found"}, 404
 
-            # Update password
+            # Hash the new password before touching the code, so a saturated
+            # hashing pool leaves the code usable for a retry
             user_account.password = password
 
+            # Only the request that actually removed the code may change the password
+            email = user_account.email
+            if not auth_code_store.consume(reset_code):
+                db.session.rollback()
+                return {"error": "Invalid reset code"}, 400
+            consumed = True
 
-
-            # Remove the used reset code
-            db.session.delete(reset)
+            # Sign out every existing session
+            user_account.revoke_sessions()
             db.session.commit()
+            # The reset is done, a later error must not bring the code back
+            consumed = False
+
+            audit_writer.record("password.reset", actor_id=user_account.id, target_type="user", target_id=user_account.id)
 
             return {"success": True}, 200
 
+        except PasswordHasherBusy as e:
+            db.session.rollback()
+            return {"error": str(e)}, 503
         except Exception as e:
             db.session.rollback()
+            if consumed:
+                # Stores outside the request transaction weren't rolled back
+                auth_code_store.restore(reset_code, email)
             return {"error": str(e)}, 500
@@ -0,0 +1,252 @@
+"""
+Queue-backed batched writer for the audit log.
+"""
+
+import os
+import re
+import time
+import queue
+import atexit
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, delete, select, text
+
+
+class AuditWriter:
+    """
+    Background thread that bulk-inserts audit events.
+
+    Requests only enqueue events. The writer inserts them in batches of up
+    to batch_size, at least every flush_interval seconds, and drains the
+    queue at interpreter exit. Requests never write to the database
+    themselves: if the queue is full the event is dropped and counted.
+
+    Retention runs every maintenance_interval seconds. On Postgres it keeps
+    monthly partitions created ahead of time and drops whole partitions that
+    fall out of the retention window. Elsewhere old rows are deleted in
+    bounded batches.
+
+    Args:
+        app: Flask application
+        db: Flask-SQLAlchemy instance
+        batch_size (int, optional): Events per INSERT. Defaults to 500.
+        flush_interval (float, optional): Seconds between flushes. Defaults to 1.
+        queue_size (int, optional): Events buffered before new ones are dropped. Defaults to 10000.
+        retention_days (int, optional): Days of events to keep. Defaults to 365.
+        maintenance_interval (float, optional): Seconds between retention runs. Defaults to 3600.
+    """
+
+    PARTITION_NAME = re.compile(r"^audit_events_y(\d{4})m(\d{2})$")
+    PURGE_BATCH_SIZE = 5000
+
+    def __init__(self, app, db, batch_size=500, flush_interval=1.0, queue_size=10000,
+                 retention_days=365, maintenance_interval=3600.0):
+        self.app = app
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.maintenance_interval = maintenance_interval
+
+        self.written = 0
+        self.dropped = 0
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._wakeup = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._last_maintenance = 0.0
+
+        atexit.register(self.flush)
+
+    def start(self):
+        """
+        Start the writer thread if it isn't running in this process.
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def record(self, action, actor_id=None, target_type=None, target_id=None, details=None):
+        """
+        Queue an audit event. Call after the audited change has committed.
+        Never raises or blocks, so a committed change is never turned into
+        an error by auditing.
+
+        Args:
+            action (str): What happened, e.g. "user.update"
+            actor_id (str, optional): ID of the user who did it
+            target_type (str, optional): Kind of record affected, e.g. "user"
+            target_id (str, optional): ID of the record affected
+            details (dict, optional): Extra JSON-serializable context
+        """
+        from setup import current_time
+
+        try:
+            self.start()
+            event = {
+                "created_at": current_time(),
+                "actor_id": actor_id,
+                "action": action,
+                "target_type": target_type,
+                "target_id": target_id,
+                "details": details,
+            }
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                self.dropped += 1
+                self._wakeup.set()
+                print(f"Audit queue full, event dropped: {action} {target_type} {target_id}")
+                return
+
+            if self._queue.qsize() >= self.batch_size:
+                self._wakeup.set()
+        except Exception as e:
+            print(f"Audit record error: {e}")
+
+    def _drain(self, limit):
+        events = []
+        while len(events) < limit:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def _run(self):
+        while True:
+            # Maintenance goes first so this month's partition exists before
+            # the first flush, otherwise those rows land in the default partition
+            if self._last_maintenance == 0.0 or time.monotonic() - self._last_maintenance >= self.maintenance_interval:
+                self._last_maintenance = time.monotonic()
+                try:
+                    self.maintain()
+                except Exception as e:
+                    print(f"Audit maintenance error: {e}")
+
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Audit writer error: {e}")
+
+    def flush(self):
+        """
+        Insert everything queued, batch_size events per statement.
+
+        Returns:
+            int: Number of events written
+        """
+        from models.AuditEvent import AuditEvent
+
+        written = 0
+        with self._flush_lock:
+            while events := self._drain(self.batch_size):
+                with self.app.app_context():
+                    session = self.db.session
+                    try:
+                        session.execute(insert(AuditEvent.__table__), events)
+                        session.commit()
+                    except Exception:
+                        session.rollback()
+                        # Put the batch back so it is retried on the next flush
+                        for event in events:
+                            try:
+                                self._queue.put_nowait(event)
+                            except queue.Full:
+                                print(f"Audit event dropped: {event}")
+                        raise
+                    finally:
+                        session.remove()
+                written += len(events)
+
+        self.written += written
+        return written
+
+    def maintain(self):
+        """
+        Apply retention and, on Postgres, create upcoming partitions.
+        """
+        from setup import current_time
+
+        now = current_time()
+        cutoff = now - timedelta(days=self.retention_days)
+
+        with self.app.app_context():
+            session = self.db.session
+            try:
+                if session.get_bind().dialect.name == "postgresql":
+                    self._maintain_partitions(session, now, cutoff)
+                else:
+                    self._purge_rows(session, cutoff)
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.remove()
+
+    def _month_start(self, year, month):
+        year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+        return datetime(year, month, 1)
+
+    def _maintain_partitions(self, session, now, cutoff):
+        # Partitions for this month and the next two, each in its own
+        # transaction. Postgres refuses a new partition while the default
+        # partition holds rows in its range, and that must not hold up the
+        # other months or retention.
+        for offset in range(3):
+            start = self._month_start(now.year, now.month + offset)
+            end = self._month_start(start.year, start.month + 1)
+            try:
+                session.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS audit_events_y{start.year:04d}m{start.month:02d} "
+                    f"PARTITION OF audit_events FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+                ))
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                print(f"Audit partition for {start:%Y-%m} not created: {e}")
+
+        # Drop partitions that end before the retention cutoff
+        partitions = session.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = 'audit_events'"
+        )).scalars().all()
+        for name in partitions:
+            match = self.PARTITION_NAME.match(name)
+            if not match:
+                continue
+            year, month = int(match.group(1)), int(match.group(2))
+            end = self._month_start(year, month + 1)
+            if end <= cutoff.replace(tzinfo=None):
+                session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+
+        session.commit()
+
+    def _purge_rows(self, session, cutoff):
+        from models.AuditEvent import AuditEvent
+
+        while True:
+            expired_ids = (
+                select(AuditEvent.id)
+                .where(AuditEvent.created_at < cutoff)
+                .limit(self.PURGE_BATCH_SIZE)
+                .scalar_subquery()
+            )
+            deleted = session.execute(
+                delete(AuditEvent).where(AuditEvent.id.in_(expired_ids))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            session.commit()
+            if deleted < self.PURGE_BATCH_SIZE:
+                break
@@ -0,0 +1,376 @@
+"""
+Stores for short-lived 2FA and password reset codes.
+
+Every store implements the same operations:
+
+    issue(email, replace=True, user_id=None) -> code
+    lookup(code) -> (email, expired), or (None, None) if unknown
+    lookup_user(code) -> (user, expired), or (None, None) if unknown
+    consume(code) -> True if this call removed the code
+    restore(code, email) -> put back a code consumed by a request that failed
+
+The SQLAlchemy store keeps codes in the auth_codes table and joins the
+request transaction, so a rollback restores a consumed code. The other
+stores keep codes out of the primary database and write immediately; a
+code left behind by a failed request simply expires, and a code consumed
+by one has to be restored.
+"""
+
+import time
+import sqlite3
+import threading
+
+from setup import generate_code
+from services.RespClient import RespClient
+
+
+class AuthCodeStore:
+    """
+    Base class for auth code stores.
+
+    Args:
+        ttl (float, optional): Seconds a code stays valid. Defaults to 300.
+    """
+
+    ISSUE_ATTEMPTS = 5
+
+    def __init__(self, ttl=300.0):
+        self.ttl = ttl
+
+    def issue(self, email, replace=True, user_id=None):
+        """
+        Create a code for an email.
+
+        Args:
+            email (str): Email the code belongs to
+            replace (bool, optional): Invalidate the email's existing codes. Defaults to True.
+            user_id (str, optional): ID of the user the code is for
+
+        Returns:
+            str: The new code
+        """
+        raise NotImplementedError
+
+    def lookup(self, code):
+        """
+        Find the email a code belongs to.
+
+        Args:
+            code (str): Code to look up
+
+        Returns:
+            tuple: (email, expired), or (None, None) if the code is unknown
+        """
+        raise NotImplementedError
+
+    def lookup_user(self, code):
+        """
+        Find the user a code belongs to.
+
+        Args:
+            code (str): Code to look up
+
+        Returns:
+            tuple: (User or None if the user no longer exists, expired),
+                or (None, None) if the code is unknown
+        """
+        from models.User import User
+
+        email, expired = self.lookup(code)
+        if email is None:
+            return None, None
+        return User.find_by_email(email), expired
+
+    def consume(self, code):
+        """
+        Delete a used code. Callers must only act on the code when this
+        returns True, since a concurrent request may have used it first.
+
+        Args:
+            code (str): Code to delete
+
+        Returns:
+            bool: True if this call removed the code
+        """
+        raise NotImplementedError
+
+    def restore(self, code, email):
+        """
+        Put back a code after the request that consumed it failed to
+        commit. The restored code is valid for a full ttl.
+
+        Args:
+            code (str): Code that was consumed
+            email (str): Email the code belonged to
+        """
+        raise NotImplementedError
+
+
+class SqlAlchemyAuthCodeStore(AuthCodeStore):
+    """
+    Default store backed by the AuthCode model. Changes are committed with
+    the rest of the request.
+
+    Args:
+        sweeper (AuthCodeSweeper, optional): Started when the first code is issued
+    """
+
+    def __init__(self, ttl=300.0, sweeper=None):
+        super().__init__(ttl)
+        self.sweeper = sweeper
+
+    def issue(self, email, replace=True, user_id=None):
+        from models.AuthCode import AuthCode
+
+        code = AuthCode.issue(email, replace=replace, user_id=user_id)
+        if self.sweeper is not None:
+            self.sweeper.start()
+        return code
+
+    def lookup(self, code):
+        from models.AuthCode import AuthCode
+
+        auth_code, expired = AuthCode.lookup(code)
+        if not auth_code:
+            return None, None
+        return auth_code.email, expired
+
+    def lookup_user(self, code):
+        from models.AuthCode import AuthCode
+
+        # One query: the user is joined into the code's SELECT
+        auth_code, expired = AuthCode.lookup(code)
+        if not auth_code:
+            return None, None
+        return auth_code.user, expired
+
+    def consume(self, code):
+        from setup import db
+        from models.AuthCode import AuthCode
+
+        # A concurrent delete of the same row waits for this transaction and then matches nothing
+        return db.session.execute(
+            db.delete(AuthCode).where(AuthCode.id == code).execution_options(synchronize_session=False)
+        ).rowcount == 1
+
+    def restore(self, code, email):
+        # The request's rollback already put the row back
+        pass
+
+
+class MemoryAuthCodeStore(AuthCodeStore):
+    """
+    Lock-protected in-process store. Only suitable for a single worker process.
+    """
+
+    def __init__(self, ttl=300.0):
+        super().__init__(ttl)
+        self._codes = {}
+        self._by_email = {}
+        self._lock = threading.Lock()
+
+    def _purge(self, now):
+        for code in [code for code, (_, expires) in self._codes.items() if expires <= now]:
+            self._discard(code)
+
+    def _discard(self, code):
+        email, _ = self._codes.pop(code, (None, None))
+        if email is None:
+            return False
+        codes = self._by_email.get(email)
+        if codes is not None:
+            codes.discard(code)
+            if not codes:
+                del self._by_email[email]
+        return True
+
+    def issue(self, email, replace=True, user_id=None):
+        with self._lock:
+            now = time.monotonic()
+            self._purge(now)
+            if replace:
+                for old in list(self._by_email.get(email, ())):
+                    self._discard(old)
+
+            for _ in range(self.ISSUE_ATTEMPTS):
+                code = generate_code()
+                if code not in self._codes:
+                    self._codes[code] = (email, now + self.ttl)
+                    self._by_email.setdefault(email, set()).add(code)
+                    return code
+        raise RuntimeError("Could not generate a unique code, please try again.")
+
+    def lookup(self, code):
+        with self._lock:
+            entry = self._codes.get(code)
+            if entry is None:
+                return None, None
+            return entry[0], entry[1] <= time.monotonic()
+
+    def consume(self, code):
+        with self._lock:
+            return self._discard(code)
+
+    def restore(self, code, email):
+        with self._lock:
+            if code not in self._codes:
+                self._codes[code] = (email, time.monotonic() + self.ttl)
+                self._by_email.setdefault(email, set()).add(code)
+
+
+class SqliteAuthCodeStore(AuthCodeStore):
+    """
+    Store in a local SQLite file shared by every worker on one host.
+
+    Args:
+        path (str): SQLite database file
+    """
+
+    PURGE_BATCH_SIZE = 500
+
+    def __init__(self, path, ttl=300.0):
+        super().__init__(ttl)
+        self.path = path
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS auth_codes ("
+            "code TEXT PRIMARY KEY, email TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_auth_codes_email ON auth_codes (email)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_auth_codes_expires_at ON auth_codes (expires_at)")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    def issue(self, email, replace=True, user_id=None):
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "DELETE FROM auth_codes WHERE rowid IN "
+                "(SELECT rowid FROM auth_codes WHERE expires_at <= ? LIMIT ?)",
+                (now, self.PURGE_BATCH_SIZE),
+            )
+            if replace:
+                conn.execute("DELETE FROM auth_codes WHERE email = ?", (email,))
+
+            for _ in range(self.ISSUE_ATTEMPTS):
+                code = generate_code()
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO auth_codes (code, email, expires_at) VALUES (?, ?, ?)",
+                    (code, email, now + self.ttl),
+                ).rowcount
+                if inserted:
+                    conn.execute("COMMIT")
+                    return code
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("ROLLBACK")
+        raise RuntimeError("Could not generate a unique code, please try again.")
+
+    def lookup(self, code):
+        row = self._connection().execute(
+            "SELECT email, expires_at FROM auth_codes WHERE code = ?", (code,)
+        ).fetchone()
+        if row is None:
+            return None, None
+        return row[0], row[1] <= time.time()
+
+    def consume(self, code):
+        return self._connection().execute("DELETE FROM auth_codes WHERE code = ?", (code,)).rowcount == 1
+
+    def restore(self, code, email):
+        self._connection().execute(
+            "INSERT OR IGNORE INTO auth_codes (code, email, expires_at) VALUES (?, ?, ?)",
+            (code, email, time.time() + self.ttl),
+        )
+
+
+class RedisAuthCodeStore(AuthCodeStore):
+    """
+    Store in a Redis-protocol server. Codes expire through key TTLs, so
+    lookups never report an expired code.
+
+    Args:
+        url (str): redis://host:port/db URL
+        prefix (str, optional): Key prefix. Defaults to "authcode:".
+    """
+
+    def __init__(self, url, ttl=300.0, prefix="authcode:"):
+        super().__init__(ttl)
+        self.client = RespClient(url)
+        self.prefix = prefix
+
+    def _code_key(self, code):
+        return f"{self.prefix}code:{code}"
+
+    def _email_key(self, email):
+        return f"{self.prefix}email:{email}"
+
+    def issue(self, email, replace=True, user_id=None):
+        ttl_ms = int(self.ttl * 1000)
+        email_key = self._email_key(email)
+
+        if replace:
+            existing = self.client.execute("SMEMBERS", email_key) or []
+            if existing:
+                self.client.execute("DEL", *[self._code_key(code) for code in existing])
+            self.client.execute("DEL", email_key)
+
+        for _ in range(self.ISSUE_ATTEMPTS):
+            code = generate_code()
+            # NX makes the key itself the uniqueness check
+            if self.client.execute("SET", self._code_key(code), email, "PX", ttl_ms, "NX") is not None:
+                self.client.execute("SADD", email_key, code)
+                self.client.execute("PEXPIRE", email_key, ttl_ms)
+                return code
+        raise RuntimeError("Could not generate a unique code, please try again.")
+
+    def lookup(self, code):
+        email = self.client.execute("GET", self._code_key(code))
+        if email is None:
+            return None, None
+        return email, False
+
+    def consume(self, code):
+        return self.client.execute("DEL", self._code_key(code)) == 1
+
+    def restore(self, code, email):
+        ttl_ms = int(self.ttl * 1000)
+        if self.client.execute("SET", self._code_key(code), email, "PX", ttl_ms, "NX") is not None:
+            self.client.execute("SADD", self._email_key(email), code)
+            self.client.execute("PEXPIRE", self._email_key(email), ttl_ms)
+
+
+def create_auth_code_store(name, ttl=300.0, url=None, sweeper=None):
+    """
+    Build an auth code store by name.
+
+    Args:
+        name (str): One of "sqlalchemy", "memory", "sqlite" or "redis"
+        ttl (float, optional): Seconds a code stays valid
+        url (str, optional): SQLite file path or redis:// URL
+        sweeper (AuthCodeSweeper, optional): Sweeper for the SQLAlchemy store
+
+    Returns:
+        AuthCodeStore: Store instance
+    """
+    if name == "sqlalchemy":
+        return SqlAlchemyAuthCodeStore(ttl, sweeper=sweeper)
+    if name == "memory":
+        return MemoryAuthCodeStore(ttl)
+    if name == "sqlite":
+        return SqliteAuthCodeStore(url or "auth_codes.db", ttl)
+    if name == "redis":
+        return RedisAuthCodeStore(url or "redis://127.0.0.1:6379/0", ttl)
+    raise ValueError(f"Unknown auth code store: {name}")
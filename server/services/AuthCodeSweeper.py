@@ -0,0 +1,80 @@
+"""
+Background sweeper that deletes expired auth codes.
+"""
+
+import os
+import time
+import threading
+
+
+class AuthCodeSweeper:
+    """
+    Daemon thread that purges expired auth codes in bounded batches so the
+    table doesn't grow without limit and no single DELETE runs long.
+
+    Args:
+        app: Flask application
+        db: Flask-SQLAlchemy instance
+        interval (float, optional): Seconds between sweeps. Defaults to 60.
+        batch_size (int, optional): Rows deleted per statement. Defaults to 1000.
+        pause (float, optional): Seconds to sleep between batches. Defaults to 0.1.
+    """
+
+    def __init__(self, app, db, interval=60.0, batch_size=1000, pause=0.1):
+        self.app = app
+        self.db = db
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+
+        self.deleted = 0
+
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def start(self):
+        """
+        Start the sweeper thread if it isn't running in this process.
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._thread = threading.Thread(target=self._run, name="auth-code-sweeper", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Auth code sweeper error: {e}")
+            time.sleep(self.interval)
+
+    def sweep(self):
+        """
+        Delete expired codes batch by batch until none are left.
+
+        Returns:
+            int: Number of rows deleted
+        """
+        from models.AuthCode import AuthCode
+
+        total = 0
+        with self.app.app_context():
+            try:
+                while True:
+                    deleted = AuthCode.purge_expired(self.batch_size)
+                    total += deleted
+                    if deleted < self.batch_size:
+                        break
+                    time.sleep(self.pause)
+            except Exception:
+                self.db.session.rollback()
+                raise
+            finally:
+                self.db.session.remove()
+
+        self.deleted += total
+        return total
@@ -0,0 +1,114 @@
+"""
+Pluggable email transports used by the outbox worker.
+
+Every transport takes a batch of message dicts in Resend's format
+({"from", "to", "subject", "html"}) and raises on failure.
+"""
+
+import json
+import time
+import threading
+
+import requests
+
+
+class EmailTransportError(Exception):
+    """
+    Raised when a transport fails to deliver a batch.
+    """
+
+
+class ResendTransport:
+    """
+    Sends batches through Resend's batch endpoint on a pooled HTTP session.
+
+    Args:
+        api_key (str): Resend API key
+        timeout (float, optional): Request timeout in seconds. Defaults to 10.
+    """
+
+    BATCH_URL = "https://api.resend.com/emails/batch"
+    MAX_BATCH_SIZE = 100
+
+    def __init__(self, api_key, timeout=10.0):
+        self.timeout = timeout
+        self._session = requests.Session()
+        self._session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        })
+
+    def send_batch(self, messages):
+        try:
+            response = self._session.post(self.BATCH_URL, json=messages, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise EmailTransportError(str(e)) from e
+
+        if response.status_code >= 400:
+            raise EmailTransportError(f"Resend returned {response.status_code}: {response.text}")
+
+
+class MemoryTransport:
+    """
+    Keeps messages in memory. Useful for tests and offline load testing.
+
+    Args:
+        latency (float, optional): Simulated seconds per batch. Defaults to 0.
+    """
+
+    MAX_BATCH_SIZE = 100
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send_batch(self, messages):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.sent.extend(messages)
+
+
+class FileTransport:
+    """
+    Appends messages to a file as JSON lines, one message per line.
+
+    Args:
+        path (str): File to append to
+    """
+
+    MAX_BATCH_SIZE = 100
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send_batch(self, messages):
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                for message in messages:
+                    f.write(json.dumps(message) + "\n")
+        except OSError as e:
+            raise EmailTransportError(str(e)) from e
+
+
+def create_transport(name, api_key=None, path=None):
+    """
+    Build a transport by name.
+
+    Args:
+        name (str): One of "resend", "memory" or "file"
+        api_key (str, optional): Resend API key
+        path (str, optional): Output file for the file transport
+
+    Returns:
+        Transport instance
+    """
+    if name == "resend":
+        return ResendTransport(api_key)
+    if name == "memory":
+        return MemoryTransport()
+    if name == "file":
+        return FileTransport(path or "email_outbox.jsonl")
+    raise ValueError(f"Unknown email transport: {name}")
@@ -0,0 +1,298 @@
+"""
+Background worker that drains the email outbox.
+"""
+
+import os
+import time
+import threading
+from datetime import timedelta
+
+from services.EmailTransport import EmailTransportError
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing dependency for a while after repeated failures.
+
+    Closed: calls go through. Open: calls are skipped until reset_timeout
+    passes. Half-open: one call is let through, success closes the breaker
+    and failure opens it again.
+
+    Args:
+        failure_threshold (int, optional): Consecutive failures before opening. Defaults to 5.
+        reset_timeout (float, optional): Seconds to stay open. Defaults to 30.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        """
+        Returns:
+            bool: True if a call may be attempted
+        """
+        return self.state != "open"
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+
+class OutboxWorker:
+    """
+    Daemon thread that sends pending outbox rows in batches.
+
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED so several
+    processes can run a worker against the same table. Claiming marks them
+    sending with a lease and commits, the batch is sent outside any
+    transaction, and the results are written in a second one. When a batch fails
+    its rows are resent one at a time, so only the messages that still fail
+    use up an attempt. Those are retried with exponential backoff until
+    max_attempts is reached. If the first OUTAGE_PROBES single sends all
+    fail, the transport is treated as down and the rest of the batch is left
+    for the next poll without using an attempt.
+
+    Args:
+        app: Flask application
+        db: Flask-SQLAlchemy instance
+        transport: Email transport with a send_batch(messages) method
+        batch_size (int, optional): Rows per batch. Defaults to 50.
+        poll_interval (float, optional): Seconds between polls when idle. Defaults to 5.
+        max_attempts (int, optional): Attempts before a row is marked failed. Defaults to 6.
+        backoff_base (float, optional): First retry delay in seconds. Defaults to 5.
+        backoff_max (float, optional): Largest retry delay in seconds. Defaults to 900.
+        lease (float, optional): Seconds a claimed row stays with this worker
+            before another may claim it again. Defaults to 300.
+        breaker (CircuitBreaker, optional): Breaker guarding the transport
+    """
+
+    OUTAGE_PROBES = 3
+
+    def __init__(self, app, db, transport, batch_size=50, poll_interval=5.0,
+                 max_attempts=6, backoff_base=5.0, backoff_max=900.0, lease=300.0, breaker=None):
+        self.app = app
+        self.db = db
+        self.transport = transport
+        self.batch_size = min(batch_size, getattr(transport, "MAX_BATCH_SIZE", batch_size))
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease = lease
+        self.breaker = breaker or CircuitBreaker()
+
+        self.sent = 0
+        self.failed = 0
+
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def start(self):
+        """
+        Start the worker thread if it isn't running in this process.
+        """
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid() and thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def notify(self):
+        """
+        Wake the worker after new rows were committed.
+        """
+        self.start()
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            try:
+                while self.drain_once():
+                    pass
+            except Exception as e:
+                print(f"Email outbox worker error: {e}")
+
+    def _backoff(self, attempts):
+        return timedelta(seconds=min(self.backoff_base * 2 ** (attempts - 1), self.backoff_max))
+
+    def drain_once(self):
+        """
+        Claim, send and record a single batch.
+
+        Returns:
+            int: Number of rows sent in this batch
+        """
+        if not self.breaker.allow():
+            return 0
+
+        claimed, lease_until = self._claim()
+        if not claimed:
+            return 0
+
+        messages = [(row_id, message) for row_id, message, _ in claimed]
+        try:
+            self.transport.send_batch([message for _, message in messages])
+            sent, failures = [row_id for row_id, _ in messages], []
+        except EmailTransportError as e:
+            sent, failures = self._send_individually(messages, e)
+
+        # Any delivery means the transport is up and the failures are the messages' own
+        if sent:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+        self._record(claimed, lease_until, sent, dict(failures))
+        self.sent += len(sent)
+        return len(sent)
+
+    def _claim(self):
+        """
+        Mark a batch of due rows as sending and commit, so no lock or
+        transaction is held while the transport is called. Rows left in
+        sending by a worker that died are claimed again once their lease
+        runs out.
+
+        Returns:
+            tuple: ([(id, message, attempts)], lease expiry)
+        """
+        from setup import current_time
+        from models.EmailOutbox import EmailOutbox
+
+        with self.app.app_context():
+            session = self.db.session
+            try:
+                now = current_time()
+                lease_until = now + timedelta(seconds=self.lease)
+                batch = (
+                    session.query(EmailOutbox)
+                    .filter(EmailOutbox.status.in_(("pending", "sending")), EmailOutbox.next_attempt_at <= now)
+                    .order_by(EmailOutbox.id)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                    .all()
+                )
+                claimed = [(row.id, row.to_message(), row.attempts) for row in batch]
+                for row in batch:
+                    row.status = "sending"
+                    row.next_attempt_at = lease_until
+                session.commit()
+                return claimed, lease_until
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.remove()
+
+    def _record(self, claimed, lease_until, sent, failures):
+        """
+        Write the results of a send in a second short transaction. A row
+        whose lease ran out and was claimed again is left to its new owner.
+
+        Args:
+            claimed (list): [(id, message, attempts)] from _claim
+            lease_until (datetime): Lease the rows were claimed with
+            sent (list): IDs of rows sent
+            failures (dict): ID to the error of rows that failed. Claimed
+                rows in neither were not tried and go back to pending.
+        """
+        from setup import current_time
+        from models.EmailOutbox import EmailOutbox
+
+        with self.app.app_context():
+            session = self.db.session
+            try:
+                now = current_time()
+                sent = set(sent)
+                for row_id, _, attempts in claimed:
+                    values = {"status": "pending", "next_attempt_at": now}
+                    if row_id in sent:
+                        values = {"status": "sent", "attempts": attempts + 1, "sent_at": now, "last_error": None}
+                    elif row_id in failures:
+                        values = {"attempts": attempts + 1, "last_error": str(failures[row_id])[:500]}
+                        if attempts + 1 >= self.max_attempts:
+                            values["status"] = "failed"
+                            self.failed += 1
+                        else:
+                            values["next_attempt_at"] = now + self._backoff(attempts + 1)
+                    session.execute(
+                        self.db.update(EmailOutbox)
+                        .where(
+                            EmailOutbox.id == row_id,
+                            EmailOutbox.status == "sending",
+                            EmailOutbox.next_attempt_at == lease_until,
+                        )
+                        .values(**values)
+                    )
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.remove()
+
+    def _send_individually(self, messages, error):
+        """
+        Resend the messages of a failed batch one at a time.
+
+        Args:
+            messages (list): [(id, message)] for the claimed rows
+            error (EmailTransportError): Why the whole batch failed
+
+        Returns:
+            tuple: (IDs sent, [(id, error)] for rows that failed). Rows not
+                tried because the transport looks down are in neither.
+        """
+        if len(messages) == 1:
+            return [], [(messages[0][0], error)]
+
+        sent, failures = [], []
+        for row_id, message in messages:
+            if not sent and len(failures) >= self.OUTAGE_PROBES:
+                break
+            try:
+                self.transport.send_batch([message])
+                sent.append(row_id)
+            except EmailTransportError as e:
+                failures.append((row_id, e))
+        return sent, failures
+
+    def stats(self):
+        """
+        Get worker counters.
+
+        Returns:
+            dict: Sent and failed counts plus breaker state
+        """
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "breaker": self.breaker.state,
+        }
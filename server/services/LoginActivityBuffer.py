@@ -0,0 +1,155 @@
+"""
+Write-behind buffer for low-value per-login writes.
+"""
+
+import os
+import atexit
+import threading
+
+from sqlalchemy import update, insert, bindparam
+
+
+class LoginActivityBuffer:
+    """
+    Collects last_login updates (and optional login activity rows) in memory
+    and writes them from a background thread, so login requests don't wait
+    on these writes.
+
+    Updates are coalesced per user, only the latest last_login is kept. A
+    flush runs every flush_interval seconds or as soon as max_items are
+    pending, and once more at interpreter exit. A failed flush puts its
+    items back for the next attempt.
+
+    Args:
+        app: Flask application
+        db: Flask-SQLAlchemy instance
+        flush_interval (float, optional): Seconds between flushes. Defaults to 0.5.
+        max_items (int, optional): Pending items that trigger an early flush. Defaults to 500.
+        record_activity (bool, optional): Also insert a LoginActivity row per login. Defaults to False.
+    """
+
+    def __init__(self, app, db, flush_interval=0.5, max_items=500, record_activity=False):
+        self.app = app
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_items = max_items
+        self.record_activity = record_activity
+
+        self.flushed = 0
+
+        self._last_logins = {}
+        self._activity = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+        atexit.register(self.flush)
+
+    def start(self):
+        """
+        Start the flusher thread if it isn't running in this process.
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._thread = threading.Thread(target=self._run, name="login-activity", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def record_login(self, user_id, at, ip_address=None, user_agent=None):
+        """
+        Buffer a successful login.
+
+        Args:
+            user_id (str): ID of the user who logged in
+            at (datetime): Login time
+            ip_address (str, optional): Client address
+            user_agent (str, optional): Client user agent
+        """
+        self.start()
+        with self._lock:
+            previous = self._last_logins.get(user_id)
+            if previous is None or at > previous:
+                self._last_logins[user_id] = at
+            if self.record_activity:
+                self._activity.append({
+                    "user_id": user_id,
+                    "ip_address": ip_address,
+                    "user_agent": user_agent,
+                    "created_at": at,
+                })
+            pending = len(self._last_logins) + len(self._activity)
+
+        if pending >= self.max_items:
+            self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Login activity flush error: {e}")
+
+    def _requeue(self, last_logins, activity):
+        with self._lock:
+            for user_id, at in last_logins.items():
+                previous = self._last_logins.get(user_id)
+                if previous is None or at > previous:
+                    self._last_logins[user_id] = at
+            self._activity[:0] = activity
+
+    def flush(self):
+        """
+        Write everything pending with one bulk UPDATE and one bulk INSERT.
+
+        Returns:
+            int: Number of items written
+        """
+        from setup import user_cache, user_list_cache
+        from models.User import User
+        from models.LoginActivity import LoginActivity
+
+        with self._flush_lock:
+            with self._lock:
+                last_logins, self._last_logins = self._last_logins, {}
+                activity, self._activity = self._activity, []
+
+            if not last_logins and not activity:
+                return 0
+
+            with self.app.app_context():
+                session = self.db.session
+                try:
+                    if last_logins:
+                        # One UPDATE statement sent as a single executemany. version is left
+                        # alone: logging in shouldn't fail a profile edit's If-Match
+                        users = User.__table__
+                        session.execute(
+                            update(users)
+                            .where(users.c.id == bindparam("b_id"))
+                            .values(last_login=bindparam("b_last_login")),
+                            [{"b_id": user_id, "b_last_login": at} for user_id, at in last_logins.items()],
+                        )
+                    if activity:
+                        session.execute(insert(LoginActivity.__table__), activity)
+                    session.commit()
+                except Exception:
+                    session.rollback()
+                    self._requeue(last_logins, activity)
+                    raise
+                finally:
+                    session.remove()
+
+            # Bulk UPDATEs skip mapper events
+            for user_id in last_logins:
+                user_cache.invalidate(user_id)
+            if last_logins:
+                user_list_cache.invalidate()
+
+            written = len(last_logins) + len(activity)
+            self.flushed += written
+            return written
@@ -0,0 +1,325 @@
+"""
+Request and database metrics in the Prometheus text format.
+
+Recording never takes a lock. Each thread adds into its own shard, and
+shards are merged only when metrics are collected. With a metrics directory
+configured, every worker process also writes its merged totals to
+<directory>/metrics_<pid>.json about once a second, and collection sums the
+files of all workers. This is the same approach prometheus_client's
+multiprocess mode uses. In-flight gauges of workers that have exited are
+dropped, and their counters are kept.
+"""
+
+import os
+import json
+import time
+import glob
+import math
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    return "+Inf" if value == math.inf else repr(float(value))
+
+
+class Metrics:
+    """
+    Lock-free counters, gauges and histograms with Prometheus text output.
+
+    Args:
+        directory (str, optional): Shared directory for multi-process
+            aggregation. Defaults to None (this process only).
+        flush_interval (float, optional): Seconds between writes to the
+            directory. Defaults to 1.
+    """
+
+    def __init__(self, directory=None, flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+
+        self._meta = {}
+        self._local = threading.local()
+        self._shards = []
+        self._retired = {}
+        self._prune_at = 64
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def describe(self, name, kind, help_text, buckets=None):
+        """
+        Declare a metric.
+
+        Args:
+            name (str): Metric name
+            kind (str): "counter", "gauge" or "histogram"
+            help_text (str): HELP line
+            buckets (tuple, optional): Upper bounds for a histogram
+        """
+        self._meta[name] = (kind, help_text, tuple(buckets or ()))
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+                # Threaded servers start a thread per request, so fold away
+                # shards of finished threads as the list grows
+                if len(self._shards) >= self._prune_at:
+                    self._prune()
+                    self._prune_at = max(64, len(self._shards) * 2)
+            if self.directory:
+                self.start()
+        return shard
+
+    def _prune(self):
+        """
+        Fold the shards of finished threads into the retired totals. A
+        finished thread can't write again, so this is safe. Called with _lock held.
+        """
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                self._merge(self._retired, shard.items())
+        self._shards = alive
+
+    def inc(self, name, labels=(), value=1.0):
+        """
+        Add to a counter or gauge. labels is a tuple of (name, value) pairs.
+        """
+        shard = self._shard()
+        key = (name, labels)
+        shard[key] = shard.get(key, 0.0) + value
+
+    def observe(self, name, labels, value):
+        """
+        Record one histogram observation.
+        """
+        shard = self._shard()
+        key = (name, labels)
+        state = shard.get(key)
+        if state is None:
+            # One slot per bucket, then +Inf, sum and count
+            state = shard[key] = [0.0] * (len(self._meta[name][2]) + 3)
+        buckets = self._meta[name][2]
+        for index, bound in enumerate(buckets):
+            if value <= bound:
+                state[index] += 1
+                break
+        else:
+            state[len(buckets)] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def _merge(self, target, values):
+        for key, value in values:
+            if isinstance(value, list):
+                current = target.get(key)
+                target[key] = list(value) if current is None else [a + b for a, b in zip(current, value)]
+            else:
+                target[key] = target.get(key, 0.0) + value
+
+    def local_snapshot(self):
+        """
+        Returns:
+            dict: This process's totals keyed by (name, labels)
+        """
+        with self._lock:
+            self._prune()
+            shards = [shard for _, shard in self._shards]
+            totals = {}
+            self._merge(totals, self._retired.items())
+        for shard in shards:
+            self._merge(totals, shard.copy().items())
+        return totals
+
+    def start(self):
+        """
+        Start the writer thread if it isn't running in this process.
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.write()
+            except Exception as e:
+                print(f"Metrics writer error: {e}")
+
+    def write(self):
+        """
+        Write this process's totals to the metrics directory.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"metrics_{os.getpid()}.json")
+        payload = [[name, [list(pair) for pair in labels], value] for (name, labels), value in self.local_snapshot().items()]
+        with open(path + ".tmp", "w") as f:
+            json.dump(payload, f)
+        os.replace(path + ".tmp", path)
+
+    def _process_alive(self, pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def collect(self):
+        """
+        Merge totals across processes.
+
+        Returns:
+            dict: Totals keyed by (name, labels)
+        """
+        if not self.directory:
+            return self.local_snapshot()
+
+        self.write()
+        totals = {}
+        for path in glob.glob(os.path.join(self.directory, "metrics_*.json")):
+            try:
+                pid = int(os.path.basename(path)[len("metrics_"):-len(".json")])
+                with open(path) as f:
+                    payload = json.load(f)
+            except (ValueError, OSError):
+                continue
+            alive = self._process_alive(pid)
+            self._merge(totals, (
+                ((name, tuple(tuple(pair) for pair in labels)), value)
+                for name, labels, value in payload
+                if name in self._meta and (alive or self._meta[name][0] != "gauge")
+            ))
+        return totals
+
+    def _labels(self, labels, extra=()):
+        pairs = tuple(labels) + tuple(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+    def render(self):
+        """
+        Returns:
+            str: All metrics in the Prometheus text exposition format
+        """
+        totals = self.collect()
+        lines = []
+        for name, (kind, help_text, buckets) in self._meta.items():
+            series = sorted((labels, value) for (metric, labels), value in totals.items() if metric == name)
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in series:
+                if kind != "histogram":
+                    lines.append(f"{name}{self._labels(labels)} {_number(value)}")
+                    continue
+                cumulative = 0.0
+                for bound, count in zip(buckets + (math.inf,), value):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{self._labels(labels, (('le', _number(bound)),))} {_number(cumulative)}")
+                lines.append(f"{name}_sum{self._labels(labels)} {_number(value[-2])}")
+                lines.append(f"{name}_count{self._labels(labels)} {_number(value[-1])}")
+        return "\n".join(lines) + "\n"
+
+
+class RequestMetrics(Metrics):
+    """
+    Per-resource request latency, status and in-flight metrics, plus the
+    number and time of SQL statements each request runs.
+
+    Resources are labelled by their flask_restful class name, other views by
+    endpoint name. Statements run outside a request count as "background".
+    """
+
+    def __init__(self, directory=None, flush_interval=1.0):
+        super().__init__(directory, flush_interval)
+        self.describe("http_requests_total", "counter", "Requests handled, by resource, method and status.")
+        self.describe("http_request_duration_seconds", "histogram", "Request latency in seconds.", REQUEST_BUCKETS)
+        self.describe("http_requests_in_flight", "gauge", "Requests currently being handled.")
+        self.describe("db_statements_total", "counter", "SQL statements executed.")
+        self.describe("db_statement_seconds_total", "counter", "Time spent executing SQL statements.")
+        self.describe("db_statements_per_request", "histogram", "SQL statements executed per request.", STATEMENT_BUCKETS)
+
+    def init_app(self, app):
+        """
+        Register the request hooks on app and the statement hooks on every engine.
+        """
+        from flask import g, request, has_request_context
+
+        def resource_labels():
+            view = app.view_functions.get(request.endpoint)
+            resource = getattr(view, "view_class", None)
+            name = resource.__name__ if resource is not None else (request.endpoint or "unmatched")
+            return (("resource", name), ("method", request.method))
+
+        @app.before_request
+        def start_request_metrics():
+            g.metrics_labels = resource_labels()
+            g.metrics_start = time.perf_counter()
+            g.metrics_statements = 0
+            g.metrics_statement_seconds = 0.0
+            self.inc("http_requests_in_flight", g.metrics_labels)
+
+        @app.after_request
+        def record_response_status(response):
+            g.metrics_status = response.status_code
+            return response
+
+        @app.teardown_request
+        def finish_request_metrics(exc):
+            labels = g.pop("metrics_labels", None)
+            if labels is None:
+                return
+            status = g.pop("metrics_status", 500)
+            self.inc("http_requests_in_flight", labels, -1)
+            self.inc("http_requests_total", labels + (("status", str(status)),))
+            self.observe("http_request_duration_seconds", labels, time.perf_counter() - g.metrics_start)
+            self.observe("db_statements_per_request", labels, g.metrics_statements)
+            if g.metrics_statements:
+                self.inc("db_statements_total", labels, g.metrics_statements)
+                self.inc("db_statement_seconds_total", labels, g.metrics_statement_seconds)
+
+        @event.listens_for(Engine, "before_cursor_execute")
+        def start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("metrics_statement_start", []).append(time.perf_counter())
+
+        @event.listens_for(Engine, "after_cursor_execute")
+        def record_statement(conn, cursor, statement, parameters, context, executemany):
+            starts = conn.info.get("metrics_statement_start")
+            if not starts:
+                return
+            elapsed = time.perf_counter() - starts.pop()
+            if has_request_context() and "metrics_labels" in g:
+                g.metrics_statements += 1
+                g.metrics_statement_seconds += elapsed
+            else:
+                labels = (("resource", "background"), ("method", ""))
+                self.inc("db_statements_total", labels)
+                self.inc("db_statement_seconds_total", labels, elapsed)
+
+        @event.listens_for(Engine, "handle_error")
+        def discard_statement_timer(context):
+            starts = context.connection.info.get("metrics_statement_start") if context.connection is not None else None
+            if starts:
+                starts.pop()
@@ -0,0 +1,195 @@
+"""
+Password hashing executor.
+
+bcrypt is deliberately slow, so hashing and verification are submitted to a
+process pool instead of running on the request thread.
+"""
+
+import os
+import base64
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+import bcrypt
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Raised when the hashing queue is full or a hash did not finish in time.
+    """
+
+
+def _hash_password(password):
+    """
+    Hash a plain text password with bcrypt.
+
+    Args:
+        password (str): Plain text password
+
+    Returns:
+        str: Base64 encoded bcrypt hash
+    """
+    hashed_password = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+    return base64.b64encode(hashed_password).decode("utf-8")
+
+
+def _check_password(password, password_hash):
+    """
+    Check a plain text password against a base64 encoded bcrypt hash.
+
+    Args:
+        password (str): Plain text password
+        password_hash (str): Base64 encoded bcrypt hash
+
+    Returns:
+        bool: True if the password matches, False otherwise
+    """
+    hashed_password = base64.b64decode(password_hash.encode("utf-8"))
+    return bcrypt.checkpw(password.encode("utf-8"), hashed_password)
+
+
+class PasswordHasher:
+    """
+    Bounded process pool for bcrypt hashing and verification.
+
+    Args:
+        max_workers (int, optional): Pool size. Defaults to the number of cores.
+            A value of 0 runs hashing inline on the calling thread.
+        queue_size (int, optional): Jobs allowed to wait for a free worker.
+            Defaults to 4 per worker.
+        timeout (float, optional): Seconds to wait for a result. Defaults to 10.
+    """
+
+    def __init__(self, max_workers=None, queue_size=None, timeout=10.0):
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        self.queue_size = self.max_workers * 4 if queue_size is None else queue_size
+        self.timeout = timeout
+
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.queue_size)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def _get_executor(self):
+        """
+        Lazily create the pool, recreating it after a fork so that pre-fork
+        servers don't share one pool across workers.
+        """
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                self._pid = os.getpid()
+            return self._executor
+
+    def _submit(self, fn, *args):
+        if not self.max_workers:
+            return fn(*args)
+
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Too many password operations in progress, please try again.")
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # A job that times out keeps running on its worker, so the slot is
+        # only freed once the job is actually done or cancelled
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PasswordHasherBusy("Password operation timed out, please try again.")
+
+    def hash(self, password):
+        """
+        Hash a password on the pool.
+
+        Args:
+            password (str): Plain text password
+
+        Returns:
+            str: Base64 encoded bcrypt hash
+
+        Raises:
+            PasswordHasherBusy: If the queue is full or the hash timed out
+        """
+        return self._submit(_hash_password, password)
+
+    def hash_many(self, passwords):
+        """
+        Hash a batch of passwords on the pool. Every hash in flight holds its
+        own queue slot, and the batch runs on at most max_workers - 1 workers
+        at once, so interactive hashing always keeps a worker (unless the pool
+        only has one).
+
+        Args:
+            passwords (list): Plain text passwords
+
+        Returns:
+            list: Base64 encoded bcrypt hashes in the same order
+
+        Raises:
+            PasswordHasherBusy: If no slot freed up or a hash timed out
+        """
+        if not self.max_workers:
+            return [_hash_password(password) for password in passwords]
+
+        window = threading.Semaphore(max(1, self.max_workers - 1))
+        executor = self._get_executor()
+        futures = []
+
+        def release(_):
+            self._slots.release()
+            window.release()
+
+        try:
+            for password in passwords:
+                if not window.acquire(timeout=self.timeout):
+                    raise PasswordHasherBusy("Password operation timed out, please try again.")
+                # Batches may wait for a slot, unlike interactive requests
+                if not self._slots.acquire(timeout=self.timeout):
+                    window.release()
+                    raise PasswordHasherBusy("Too many password operations in progress, please try again.")
+                try:
+                    future = executor.submit(_hash_password, password)
+                except Exception:
+                    release(None)
+                    raise
+                future.add_done_callback(release)
+                futures.append(future)
+
+            return [future.result(timeout=self.timeout) for future in futures]
+        except FutureTimeoutError:
+            raise PasswordHasherBusy("Password operation timed out, please try again.")
+        finally:
+            # Jobs not started yet are dropped when the batch fails
+            for future in futures:
+                future.cancel()
+
+    def verify(self, password, password_hash):
+        """
+        Verify a password on the pool.
+
+        Args:
+            password (str): Plain text password
+            password_hash (str): Base64 encoded bcrypt hash
+
+        Returns:
+            bool: True if the password matches, False otherwise
+
+        Raises:
+            PasswordHasherBusy: If the queue is full or the check timed out
+        """
+        return self._submit(_check_password, password, password_hash)
+
+    def shutdown(self):
+        """
+        Shut down the pool if it was started in this process.
+        """
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=True)
+            self._executor = None
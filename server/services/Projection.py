@@ -0,0 +1,84 @@
+"""
+Column projections for fast JSON serialization.
+
+A Projection selects only the requested columns, so rows come back as plain
+tuples with no ORM identity-map work, and turns them into dicts without the
+reflection SerializerMixin.to_dict does per row.
+"""
+
+from datetime import date, datetime
+
+from sqlalchemy import select
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class Projection:
+    """
+    A fixed set of model columns to load and serialize.
+
+    Args:
+        model: Mapped model class
+        fields (tuple): Column attribute names, in output order
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = tuple(fields)
+        self.columns = tuple(getattr(model, field) for field in self.fields)
+
+    def select(self):
+        """
+        Returns:
+            Select: Core SELECT of just the projected columns
+        """
+        return select(*self.columns)
+
+    def apply(self, query):
+        """
+        Narrow an ORM query to the projected columns.
+
+        Args:
+            query: Query against the model
+
+        Returns:
+            Query: Query returning Row tuples
+        """
+        return query.with_entities(*self.columns)
+
+    def row(self, row):
+        """
+        Serialize a Row returned by select() or apply().
+
+        Args:
+            row: Row tuple in field order
+
+        Returns:
+            dict: Field name to JSON-ready value
+        """
+        return {field: _json_value(value) for field, value in zip(self.fields, row)}
+
+    def rows(self, rows):
+        """
+        Serialize many rows.
+
+        Returns:
+            list: List of dicts
+        """
+        return [self.row(row) for row in rows]
+
+    def obj(self, obj):
+        """
+        Serialize an already loaded model instance.
+
+        Args:
+            obj: Model instance
+
+        Returns:
+            dict: Field name to JSON-ready value
+        """
+        return {field: _json_value(getattr(obj, field)) for field in self.fields}
@@ -0,0 +1,217 @@
+"""
+Sliding-window rate limiting for authentication endpoints.
+
+Each rule allows `limit` hits per `window` seconds. Hits are counted in
+fixed buckets one window wide, and the previous bucket is weighted by how
+much of it still overlaps the sliding window:
+
+    estimate = previous * (1 - elapsed / window) + current
+
+This needs two counters per key instead of a log of timestamps. Rejected
+hits are not counted, so Retry-After is accurate for well-behaved clients.
+"""
+
+import math
+import time
+import threading
+
+from services.RespClient import RespClient, RespError
+
+
+def parse_rule(rule):
+    """
+    Parse a "count/seconds" rule such as "5/300".
+
+    Returns:
+        tuple: (limit, window)
+    """
+    limit, window = rule.split("/", 1)
+    return int(limit), float(window)
+
+
+def _retry_after(now, window, limit, previous, current):
+    """
+    Seconds until one more hit fits under the limit, 0 if it fits now.
+    """
+    elapsed = (now % window) / window
+    if previous * (1 - elapsed) + current + 1 <= limit:
+        return 0.0
+
+    # Wait for the next bucket when the current one is already full
+    if current + 1 > limit or not previous:
+        return window * (1 - elapsed)
+
+    # Otherwise wait until enough of the previous bucket has slid out
+    needed = 1 - (limit - current - 1) / previous
+    return max(window * (needed - elapsed), 0.001)
+
+
+class MemoryRateStore:
+    """
+    Per-process counters split across independently locked shards so
+    concurrent requests for different keys rarely contend.
+
+    Args:
+        shards (int, optional): Number of shards. Defaults to 16.
+        max_keys (int, optional): Keys per shard before stale ones are swept. Defaults to 10000.
+    """
+
+    def __init__(self, shards=16, max_keys=10000):
+        self.max_keys = max_keys
+        self._shards = [({}, threading.Lock()) for _ in range(shards)]
+
+    def _shard(self, key):
+        return self._shards[hash(key) % len(self._shards)]
+
+    def _sweep(self, counters, now):
+        for key in [key for key, (bucket, _, _, window) in counters.items() if bucket < int(now // window) - 1]:
+            del counters[key]
+
+    def hit(self, key, limit, window):
+        """
+        Count a hit if it fits under the limit.
+
+        Returns:
+            float: 0 if the hit was counted, otherwise seconds to wait
+        """
+        now = time.time()
+        bucket = int(now // window)
+        counters, lock = self._shard(key)
+
+        with lock:
+            entry = counters.get(key)
+            if entry is None or entry[0] < bucket - 1:
+                previous, current = 0, 0
+            elif entry[0] == bucket - 1:
+                previous, current = entry[2], 0
+            else:
+                previous, current = entry[1], entry[2]
+
+            retry_after = _retry_after(now, window, limit, previous, current)
+            if not retry_after:
+                if entry is None and len(counters) >= self.max_keys:
+                    self._sweep(counters, now)
+                counters[key] = (bucket, previous, current + 1, window)
+            return retry_after
+
+    def reset(self, key, window):
+        counters, lock = self._shard(key)
+        with lock:
+            counters.pop(key, None)
+
+
+class RedisRateStore:
+    """
+    Counters in a Redis-protocol server, shared by every worker. The check
+    and the increment are separate commands, so a burst across workers can
+    overshoot a limit by a few hits.
+
+    Args:
+        url (str): redis://host:port/db URL
+        prefix (str, optional): Key prefix. Defaults to "ratelimit:".
+    """
+
+    def __init__(self, url, prefix="ratelimit:"):
+        self.client = RespClient(url)
+        self.prefix = prefix
+
+    def _bucket_key(self, key, bucket):
+        return f"{self.prefix}{key}:{bucket}"
+
+    def hit(self, key, limit, window):
+        now = time.time()
+        bucket = int(now // window)
+        previous, current = self.client.execute(
+            "MGET", self._bucket_key(key, bucket - 1), self._bucket_key(key, bucket)
+        )
+
+        retry_after = _retry_after(now, window, limit, int(previous or 0), int(current or 0))
+        if not retry_after:
+            current_key = self._bucket_key(key, bucket)
+            self.client.execute("INCR", current_key)
+            self.client.execute("PEXPIRE", current_key, int(window * 2000))
+        return retry_after
+
+    def reset(self, key, window):
+        bucket = int(time.time() // window)
+        self.client.execute("DEL", self._bucket_key(key, bucket - 1), self._bucket_key(key, bucket))
+
+
+class RateLimiter:
+    """
+    Named rate limit rules over a shared counter store.
+
+    Args:
+        store: MemoryRateStore or RedisRateStore
+        rules (dict): Rule name to (limit, window)
+        enabled (bool, optional): Allow everything when False. Defaults to True.
+    """
+
+    def __init__(self, store, rules, enabled=True):
+        self.store = store
+        self.rules = dict(rules)
+        self.enabled = enabled
+        self.rejected = 0
+
+    def hit(self, **keys):
+        """
+        Count one hit against every given rule.
+
+        Rules are checked in order and stop at the first rejection, so a
+        request blocked by its IP rule doesn't use up its username rule.
+        Keys that are None are skipped. If the store is unreachable the
+        request is allowed.
+
+        Args:
+            **keys: Rule name to the key being limited, e.g. login_ip="10.0.0.1"
+
+        Returns:
+            int: 0 if allowed, otherwise whole seconds to wait
+        """
+        if not self.enabled:
+            return 0
+
+        for rule, key in keys.items():
+            if key is None:
+                continue
+            limit, window = self.rules[rule]
+            try:
+                retry_after = self.store.hit(f"{rule}:{key}", limit, window)
+            except RespError as e:
+                print(f"Rate limit store unavailable: {e}")
+                return 0
+            if retry_after:
+                self.rejected += 1
+                return max(math.ceil(retry_after), 1)
+        return 0
+
+    def reset(self, rule, key):
+        """
+        Forget the hits counted for one key, e.g. after a successful login.
+        """
+        if not self.enabled or key is None:
+            return
+        try:
+            self.store.reset(f"{rule}:{key}", self.rules[rule][1])
+        except RespError as e:
+            print(f"Rate limit store unavailable: {e}")
+
+
+def create_rate_limiter(name, rules, url=None, enabled=True):
+    """
+    Build a rate limiter by store name.
+
+    Args:
+        name (str): "memory" or "redis"
+        rules (dict): Rule name to (limit, window)
+        url (str, optional): redis:// URL for the redis store
+        enabled (bool, optional): Allow everything when False
+
+    Returns:
+        RateLimiter: Limiter instance
+    """
+    if name == "memory":
+        return RateLimiter(MemoryRateStore(), rules, enabled)
+    if name == "redis":
+        return RateLimiter(RedisRateStore(url or "redis://127.0.0.1:6379/0"), rules, enabled)
+    raise ValueError(f"Unknown rate limit store: {name}")
@@ -0,0 +1,329 @@
+"""
+On-demand and sampled per-request CPU profiling.
+
+A request is profiled when any of these holds:
+- It carries a signed X-Profile-Token header.
+- An admin listed in PROFILE_ADMINS adds ?_profile to it.
+- It is the Nth request since the last sampled one, when sampling is on.
+
+Profiles come from one of two profilers:
+- "sample" (the default) reads the request thread's stack every interval
+  from another thread. It writes collapsed stacks, which speedscope and
+  flamegraph.pl load directly.
+- "cprofile" is deterministic and writes a pstats file.
+
+Files go to a directory that keeps only the newest ring_size profiles. An
+on-demand request can ask for ?_profile=summary, or send X-Profile-Format:
+summary, to get a JSON summary back in place of its response.
+
+When profiling is disabled, no hooks are registered.
+"""
+
+import os
+import sys
+import hmac
+import time
+import pstats
+import hashlib
+import cProfile
+import itertools
+import threading
+from collections import Counter
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack from a background thread.
+
+    Args:
+        thread_id (int): Thread to sample
+        interval (float, optional): Seconds between samples. Defaults to 0.005.
+    """
+
+    extension = "collapsed"
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def write(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def summary(self, limit):
+        inclusive, exclusive = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            exclusive[frames[-1]] += count
+            for name in set(frames):
+                inclusive[name] += count
+        total = sum(self.stacks.values())
+        return {
+            "samples": total,
+            "interval_ms": self.interval * 1000,
+            "top_inclusive": [{"function": name, "samples": n} for name, n in inclusive.most_common(limit)],
+            "top_self": [{"function": name, "samples": n} for name, n in exclusive.most_common(limit)],
+        }
+
+
+class DeterministicProfile:
+    """
+    cProfile around the request thread.
+    """
+
+    extension = "prof"
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def write(self, path):
+        self.profile.dump_stats(path)
+
+    def summary(self, limit):
+        stats = pstats.Stats(self.profile)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        return {
+            "calls": stats.total_calls,
+            "top_cumulative": [
+                {
+                    "function": f"{name} ({os.path.basename(filename)}:{line})",
+                    "calls": calls,
+                    "own_ms": round(own * 1000, 3),
+                    "cumulative_ms": round(cumulative * 1000, 3),
+                }
+                for (filename, line, name), (_, calls, own, cumulative, _) in rows
+            ],
+        }
+
+
+class RequestProfiler:
+    """
+    Per-request profiling hooks for a Flask app.
+
+    Args:
+        directory (str): Where profiles are written
+        secret (str, optional): Key for X-Profile-Token signatures. Defaults
+            to None (signed header disabled).
+        admins (iterable, optional): User IDs allowed to use ?_profile. Defaults to none.
+        sample_every (int, optional): Profile 1 in N requests into the ring,
+            0 to disable. Defaults to 0.
+        mode (str, optional): "sample" or "cprofile". Defaults to "sample".
+        interval (float, optional): Seconds between stack samples. Defaults to 0.005.
+        ring_size (int, optional): Profiles kept on disk. Defaults to 50.
+        max_active (int, optional): Requests profiled at once; more are left
+            unprofiled. Defaults to 4.
+        summary_limit (int, optional): Functions listed in a summary. Defaults to 25.
+    """
+
+    def __init__(self, directory, secret=None, admins=(), sample_every=0, mode="sample",
+                 interval=0.005, ring_size=50, max_active=4, summary_limit=25):
+        self.directory = directory
+        self.secret = secret
+        self.admins = set(admins)
+        self.sample_every = sample_every
+        self.mode = mode
+        self.interval = interval
+        self.ring_size = ring_size
+        self.summary_limit = summary_limit
+
+        self.profiled = 0
+        self.skipped = 0
+
+        self._counter = itertools.count(1)
+        self._active = threading.BoundedSemaphore(max_active)
+        self._ring_lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.secret or self.admins or self.sample_every)
+
+    def sign(self, ttl=300):
+        """
+        Create an X-Profile-Token value valid for ttl seconds.
+
+        Args:
+            ttl (float, optional): Seconds the token is valid. Defaults to 300.
+
+        Returns:
+            str: "<expires>.<signature>"
+        """
+        expires = str(int(time.time() + ttl))
+        return f"{expires}.{self._signature(expires)}"
+
+    def _signature(self, expires):
+        return hmac.new(self.secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+
+    def verify(self, token):
+        """
+        Check an X-Profile-Token value.
+
+        Returns:
+            bool: True if the signature is valid and it hasn't expired
+        """
+        if not self.secret or not token or "." not in token:
+            return False
+        expires, signature = token.split(".", 1)
+        if not expires.isdigit() or int(expires) < time.time():
+            return False
+        return hmac.compare_digest(signature, self._signature(expires))
+
+    def init_app(self, app):
+        """
+        Register the profiling hooks on app. Does nothing when no trigger is configured.
+        """
+        if not self.enabled:
+            return
+
+        from flask import g, request, jsonify
+
+        def is_admin():
+            from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+            try:
+                verify_jwt_in_request(optional=True)
+            except Exception:
+                return False
+            return get_jwt_identity() in self.admins
+
+        @app.before_request
+        def start_request_profile():
+            token = request.headers.get("X-Profile-Token")
+            flag = request.args.get("_profile") if self.admins else None
+            if token is not None and self.verify(token):
+                fmt = request.headers.get("X-Profile-Format", "file")
+            elif flag is not None and is_admin():
+                fmt = flag or "file"
+            elif self.sample_every and next(self._counter) % self.sample_every == 0:
+                fmt = "file"
+            else:
+                return
+
+            if not self._active.acquire(blocking=False):
+                self.skipped += 1
+                return
+            profile = DeterministicProfile() if self.mode == "cprofile" else StackSampler(threading.get_ident(), self.interval)
+            try:
+                profile.start()
+            except ValueError:
+                # Another profiler (e.g. a debugger) already owns this thread
+                self._active.release()
+                self.skipped += 1
+                return
+            g.request_profile = (profile, fmt, time.perf_counter())
+
+        @app.after_request
+        def finish_request_profile(response):
+            session = g.pop("request_profile", None)
+            if session is None:
+                return response
+            profile, fmt, started = session
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+            self._stop(profile)
+
+            view = app.view_functions.get(request.endpoint)
+            resource = getattr(getattr(view, "view_class", None), "__name__", None) or request.endpoint or "unmatched"
+            try:
+                name = self._save(profile, resource)
+            except OSError as e:
+                print(f"Request profiler error: {e}")
+                name = None
+            if name:
+                response.headers["X-Profile-Id"] = name
+
+            if fmt != "summary":
+                return response
+            summary = {
+                "request": f"{request.method} {request.path}",
+                "resource": resource,
+                "status": response.status_code,
+                "elapsed_ms": elapsed_ms,
+                "profile": name,
+                "mode": self.mode,
+            }
+            summary.update(profile.summary(self.summary_limit))
+            return jsonify(summary)
+
+        @app.teardown_request
+        def abandon_request_profile(exc):
+            session = g.pop("request_profile", None)
+            if session is not None:
+                self._stop(session[0])
+
+    def _stop(self, profile):
+        try:
+            profile.stop()
+        finally:
+            self._active.release()
+            self.profiled += 1
+
+    def _save(self, profile, resource):
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{int(time.time() * 1000)}-{os.getpid()}-{threading.get_ident()}-{resource}.{profile.extension}"
+        profile.write(os.path.join(self.directory, name))
+
+        with self._ring_lock:
+            entries = sorted(
+                (entry for entry in os.scandir(self.directory) if entry.name.endswith((".collapsed", ".prof"))),
+                key=lambda entry: entry.name,
+            )
+            for entry in entries[:max(len(entries) - self.ring_size, 0)]:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+        return name
+
+    def list_profiles(self):
+        """
+        Returns:
+            list: Profiles on disk, newest first
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith((".collapsed", ".prof"))]
+        return [
+            {"name": entry.name, "bytes": entry.stat().st_size}
+            for entry in sorted(entries, key=lambda entry: entry.name, reverse=True)
+        ]
+
+    def is_admin(self, identity):
+        return identity in self.admins
+
+    def stats(self):
+        """
+        Returns:
+            dict: Mode, sampling rate and profile counts
+        """
+        return {
+            "mode": self.mode,
+            "sample_every": self.sample_every,
+            "profiled": self.profiled,
+            "skipped": self.skipped,
+        }
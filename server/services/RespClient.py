@@ -0,0 +1,231 @@
+"""
+Minimal Redis-protocol (RESP2) client and local stand-in server.
+
+The client speaks just enough RESP for the auth code store and works
+against Redis, Valkey, KeyDB or the stand-in below. The stand-in keeps
+keys in memory and is meant for development and load testing:
+
+    python -m services.RespClient --port 6379
+"""
+
+import time
+import socket
+import argparse
+import threading
+import socketserver
+from urllib.parse import urlparse
+
+
+class RespError(Exception):
+    """
+    Raised for error replies and connection failures.
+    """
+
+
+def _encode(*args):
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+def _read_reply(stream):
+    line = stream.readline()
+    if not line:
+        raise RespError("Connection closed")
+    kind, payload = line[:1], line[1:-2]
+
+    if kind == b"+":
+        return payload.decode("utf-8")
+    if kind == b"-":
+        raise RespError(payload.decode("utf-8"))
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = stream.read(length + 2)[:-2]
+        return data.decode("utf-8")
+    if kind == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [_read_reply(stream) for _ in range(length)]
+    raise RespError(f"Unexpected reply: {line!r}")
+
+
+class RespClient:
+    """
+    Thread-safe RESP client with one lazily opened connection per thread.
+
+    Args:
+        url (str): redis://host:port/db URL
+        timeout (float, optional): Socket timeout in seconds. Defaults to 2.
+    """
+
+    def __init__(self, url="redis://127.0.0.1:6379/0", timeout=2.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            conn = (sock, sock.makefile("rb"))
+            self._local.conn = conn
+            if self.password:
+                self._call(conn, "AUTH", self.password)
+            if self.db:
+                self._call(conn, "SELECT", self.db)
+        return conn
+
+    def _call(self, conn, *args):
+        sock, stream = conn
+        sock.sendall(_encode(*args))
+        return _read_reply(stream)
+
+    def execute(self, *args):
+        """
+        Send one command and return its reply, reconnecting once on failure.
+        """
+        for attempt in range(2):
+            try:
+                return self._call(self._connection(), *args)
+            except (OSError, RespError) as e:
+                if isinstance(e, RespError) and str(e) != "Connection closed":
+                    raise
+                self.close()
+                if attempt:
+                    raise RespError(str(e)) from e
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            try:
+                conn[0].close()
+            except OSError:
+                pass
+            self._local.conn = None
+
+
+class _StandInHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        while True:
+            try:
+                command = _read_reply(self.rfile)
+            except RespError:
+                return
+            try:
+                reply = self.server.dispatch([str(arg) for arg in command])
+            except Exception as e:
+                self.wfile.write(f"-ERR {e}\r\n".encode())
+                continue
+            self.wfile.write(self._encode_reply(reply))
+
+    def _encode_reply(self, reply):
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, bool):
+            return b":%d\r\n" % int(reply)
+        if isinstance(reply, int):
+            return b":%d\r\n" % reply
+        if isinstance(reply, list):
+            return b"*%d\r\n" % len(reply) + b"".join(self._encode_reply(item) for item in reply)
+        if reply == "OK" or reply == "PONG":
+            return f"+{reply}\r\n".encode()
+        data = reply.encode("utf-8")
+        return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+class RespStandIn(socketserver.ThreadingTCPServer):
+    """
+    In-memory RESP server supporting PING, GET, MGET, SET (PX/EX/NX), DEL,
+    SADD, SMEMBERS, PEXPIRE, INCR and SELECT with lazy key expiry.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=("127.0.0.1", 6379)):
+        super().__init__(address, _StandInHandler)
+        self._data = {}
+        self._expires = {}
+        self._lock = threading.Lock()
+
+    def _alive(self, key):
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+
+    def dispatch(self, command):
+        name, args = command[0].upper(), command[1:]
+        with self._lock:
+            if name == "PING":
+                return "PONG"
+            if name in ("SELECT", "AUTH"):
+                return "OK"
+            if name == "GET":
+                return self._data[args[0]] if self._alive(args[0]) else None
+            if name == "MGET":
+                return [self._data[key] if self._alive(key) else None for key in args]
+            if name == "SET":
+                key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+                if "NX" in options and self._alive(key):
+                    return None
+                self._data[key] = value
+                self._expires.pop(key, None)
+                for unit, scale in (("PX", 1000.0), ("EX", 1.0)):
+                    if unit in options:
+                        self._expires[key] = time.monotonic() + float(args[2 + options.index(unit) + 1]) / scale
+                return "OK"
+            if name == "DEL":
+                removed = 0
+                for key in args:
+                    if self._alive(key):
+                        removed += 1
+                    self._data.pop(key, None)
+                    self._expires.pop(key, None)
+                return removed
+            if name == "SADD":
+                self._alive(args[0])
+                members = self._data.setdefault(args[0], set())
+                before = len(members)
+                members.update(args[1:])
+                return len(members) - before
+            if name == "SMEMBERS":
+                return sorted(self._data[args[0]]) if self._alive(args[0]) else []
+            if name == "PEXPIRE":
+                if not self._alive(args[0]):
+                    return 0
+                self._expires[args[0]] = time.monotonic() + float(args[1]) / 1000.0
+                return 1
+            if name == "INCR":
+                value = int(self._data[args[0]]) + 1 if self._alive(args[0]) else 1
+                self._data[args[0]] = str(value)
+                return value
+        raise ValueError(f"unknown command '{name}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Redis-protocol stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+
+    server = RespStandIn((args.host, args.port))
+    print(f"RESP stand-in listening on {args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Per-process response cache with single-flight misses and generation
+invalidation, used for the user list endpoint.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+
+class _Flight:
+    """
+    One in-progress computation that concurrent misses wait on.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with a TTL where concurrent misses for the same
+    key share a single computation.
+
+    Every entry is stamped with the generation it was computed in. Bumping
+    the generation invalidates everything at once, and a computation that
+    started before a bump is never stored.
+
+    The cache is per process. Other workers see a change once the TTL runs out.
+
+    Args:
+        maxsize (int, optional): Maximum number of entries. Defaults to 256.
+        ttl (float, optional): Seconds an entry stays valid. Defaults to 2.
+    """
+
+    def __init__(self, maxsize=256, ttl=2.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute, cacheable=None):
+        """
+        Return the cached value for key, computing it at most once across
+        concurrent callers when it is missing or expired.
+
+        Args:
+            key: Hashable cache key
+            compute (callable): Builds the value on a miss
+            cacheable (callable, optional): Decides whether a computed value
+                may be stored. Defaults to storing everything.
+
+        Returns:
+            The cached or freshly computed value
+
+        Raises:
+            Exception: Whatever compute raised, in every waiting caller
+        """
+        with self._lock:
+            generation = self.generation
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generation and entry[1] >= time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+
+            flight = self._flights.get((generation, key))
+            leader = flight is None
+            if leader:
+                flight = self._flights[(generation, key)] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop((generation, key), None)
+                store = (
+                    flight.error is None
+                    and generation == self.generation
+                    and (cacheable is None or cacheable(flight.value))
+                )
+                if store:
+                    self._entries[key] = (generation, time.monotonic() + self.ttl, flight.value)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+            flight.done.set()
+
+    def invalidate(self):
+        """
+        Drop every entry and discard computations still in progress.
+        """
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Hit, miss and coalesced counts, hit rate and current size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "generation": self.generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,297 @@
+"""
+Opt-in SQL profiler for development and tests.
+
+Every statement a request runs is reduced to its shape: literals, bound
+parameters and expanded IN lists are collapsed. A shape repeated
+repeat_threshold times in one request is reported as a likely N+1.
+Statements slower than slow_ms are kept with their plan. The plan comes from
+EXPLAIN ANALYZE for Postgres SELECTs, EXPLAIN QUERY PLAN on SQLite and plain
+EXPLAIN elsewhere.
+
+Budgets cap how many statements a resource may run per request. In strict
+mode, going over a budget raises QueryBudgetExceeded from the request so the
+test driving it fails. Otherwise it is only reported.
+
+Nothing is hooked into the engine unless the profiler is enabled.
+"""
+
+import re
+import time
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"%\(\w+\)s|%s|:\w+|\$\d+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement):
+    """
+    Normalize a statement so executions differing only in values compare equal.
+
+    Args:
+        statement (str): SQL as sent to the driver
+
+    Returns:
+        str: Statement with literals and parameters replaced by ?
+    """
+    shape = _STRING.sub("?", statement)
+    shape = _PARAM.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _IN_LIST.sub("(?)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raised in strict mode when a request runs more statements than its budget.
+    """
+
+
+class SqlProfiler:
+    """
+    Per-request statement counting, N+1 detection and slow query capture.
+
+    Args:
+        enabled (bool, optional): Hook into the engine at all. Defaults to False.
+        slow_ms (float, optional): Statements slower than this are captured. Defaults to 100.
+        repeat_threshold (int, optional): Executions of one shape in a request
+            reported as N+1. Defaults to 5.
+        explain (bool, optional): Capture a plan for slow statements. Defaults to True.
+        explain_interval (float, optional): Seconds before the same shape is
+            explained again. Defaults to 60.
+        budgets (dict, optional): Resource class or endpoint name to the
+            maximum statements per request. Defaults to none.
+        strict (bool, optional): Raise QueryBudgetExceeded instead of only
+            reporting. Defaults to False.
+        history (int, optional): Findings kept of each kind. Defaults to 100.
+    """
+
+    def __init__(self, enabled=False, slow_ms=100.0, repeat_threshold=5, explain=True,
+                 explain_interval=60.0, budgets=None, strict=False, history=100):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.repeat_threshold = repeat_threshold
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self.budgets = dict(budgets or {})
+        self.strict = strict
+
+        self.requests = 0
+        self.statements = 0
+        self.slow_queries = deque(maxlen=history)
+        self.repeated = deque(maxlen=history)
+        self.over_budget = deque(maxlen=history)
+
+        self._explained = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Register the request hooks on app and the statement hooks on every
+        engine. Does nothing when the profiler is disabled.
+        """
+        if not self.enabled:
+            return
+
+        from flask import g, request
+
+        def resource_name():
+            view = app.view_functions.get(request.endpoint)
+            resource = getattr(view, "view_class", None)
+            return resource.__name__ if resource is not None else (request.endpoint or "unmatched")
+
+        @app.before_request
+        def start_sql_profile():
+            g.sql_profile = self._local.profile = Counter()
+
+        @app.after_request
+        def check_sql_profile(response):
+            profile = g.pop("sql_profile", None)
+            self._local.profile = None
+            if profile is None:
+                return response
+
+            count = sum(profile.values())
+            response.headers["X-Query-Count"] = str(count)
+            self._finish(f"{request.method} {request.path}", resource_name(), profile, count)
+            return response
+
+        @app.teardown_request
+        def clear_sql_profile(exc):
+            self._local.profile = None
+
+        @event.listens_for(Engine, "before_cursor_execute")
+        def start_profile_timer(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("sql_profile_start", []).append(time.perf_counter())
+
+        @event.listens_for(Engine, "after_cursor_execute")
+        def profile_statement(conn, cursor, statement, parameters, context, executemany):
+            starts = conn.info.get("sql_profile_start")
+            if not starts:
+                return
+            elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+            self._record(conn, cursor, statement, parameters, executemany, elapsed_ms)
+
+        @event.listens_for(Engine, "handle_error")
+        def discard_profile_timer(context):
+            starts = context.connection.info.get("sql_profile_start") if context.connection is not None else None
+            if starts:
+                starts.pop()
+
+    def _record(self, conn, cursor, statement, parameters, executemany, elapsed_ms):
+        self.statements += 1
+        shape = statement_shape(statement)
+        profile = getattr(self._local, "profile", None)
+        if profile is not None:
+            profile[shape] += 1
+
+        if elapsed_ms < self.slow_ms:
+            return
+
+        entry = {
+            "statement": shape,
+            "elapsed_ms": round(elapsed_ms, 3),
+            "at": time.time(),
+            "plan": None,
+        }
+        if self.explain and not executemany and self._should_explain(shape):
+            try:
+                entry["plan"] = self._explain(conn, cursor, statement, parameters)
+            except Exception as e:
+                entry["plan"] = [f"EXPLAIN failed: {e}"]
+        self.slow_queries.append(entry)
+        print(f"Slow query ({entry['elapsed_ms']} ms): {shape}")
+
+    def _should_explain(self, shape):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._explained.get(shape, -self.explain_interval) < self.explain_interval:
+                return False
+            self._explained[shape] = now
+            if len(self._explained) > 1000:
+                self._explained = {key: at for key, at in self._explained.items() if now - at < self.explain_interval}
+            return True
+
+    def _explain(self, conn, cursor, statement, parameters):
+        """
+        Run EXPLAIN on a raw DBAPI cursor, so it isn't seen by engine events.
+        On Postgres it runs inside a savepoint, since a failed EXPLAIN would
+        otherwise abort the request's transaction. ANALYZE is only used for
+        SELECTs because it executes the statement again.
+        """
+        dialect = conn.dialect.name
+        if dialect == "postgresql":
+            prefix = "EXPLAIN ANALYZE " if statement.lstrip()[:6].upper() == "SELECT" else "EXPLAIN "
+        elif dialect == "sqlite":
+            prefix = "EXPLAIN QUERY PLAN "
+        else:
+            prefix = "EXPLAIN "
+
+        raw = cursor.connection.cursor()
+        try:
+            if dialect == "postgresql":
+                raw.execute("SAVEPOINT sql_profiler_explain")
+            try:
+                raw.execute(prefix + statement, parameters)
+                plan = [" ".join(str(column) for column in row) for row in raw.fetchall()]
+            except Exception:
+                if dialect == "postgresql":
+                    raw.execute("ROLLBACK TO SAVEPOINT sql_profiler_explain")
+                raise
+            if dialect == "postgresql":
+                raw.execute("RELEASE SAVEPOINT sql_profiler_explain")
+            return plan
+        finally:
+            raw.close()
+
+    def _finish(self, request_line, name, profile, count):
+        with self._lock:
+            self.requests += 1
+
+        for shape, executions in profile.items():
+            if executions >= self.repeat_threshold:
+                self.repeated.append({
+                    "request": request_line,
+                    "resource": name,
+                    "statement": shape,
+                    "executions": executions,
+                    "at": time.time(),
+                })
+                print(f"Possible N+1 in {request_line}: {executions}x {shape}")
+
+        budget = self.budgets.get(name)
+        if budget is not None and count > budget:
+            self.over_budget.append({
+                "request": request_line,
+                "resource": name,
+                "statements": count,
+                "budget": budget,
+                "at": time.time(),
+            })
+            message = f"{request_line} ran {count} statements, over the budget of {budget} for {name}"
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            print(message)
+
+    @contextmanager
+    def budget(self, max_statements):
+        """
+        Fail a block of code that runs more than max_statements statements on
+        this thread, for use in tests outside a request.
+
+        Args:
+            max_statements (int): Statements allowed
+
+        Raises:
+            QueryBudgetExceeded: When the block ran more statements
+        """
+        outer = getattr(self._local, "profile", None)
+        profile = self._local.profile = Counter()
+        try:
+            yield profile
+        finally:
+            self._local.profile = outer
+            if outer is not None:
+                outer.update(profile)
+
+        count = sum(profile.values())
+        if count > max_statements:
+            repeated = ", ".join(f"{n}x {shape}" for shape, n in profile.most_common(3))
+            raise QueryBudgetExceeded(f"Ran {count} statements, over the budget of {max_statements}: {repeated}")
+
+    def stats(self):
+        """
+        Returns:
+            dict: Counters and the most recent findings
+        """
+        return {
+            "enabled": self.enabled,
+            "requests": self.requests,
+            "statements": self.statements,
+            "slow_ms": self.slow_ms,
+            "repeat_threshold": self.repeat_threshold,
+            "budgets": self.budgets,
+            "slow_queries": list(self.slow_queries),
+            "repeated": list(self.repeated),
+            "over_budget": list(self.over_budget),
+        }
+
+
+def parse_budgets(value):
+    """
+    Parse "UserById=4,Users=3" into {"UserById": 4, "Users": 3}.
+    """
+    budgets = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, budget = item.split("=", 1)
+        budgets[name.strip()] = int(budget)
+    return budgets
@@ -0,0 +1,189 @@
+"""
+Background system status sampling for the dashboard and /status.
+
+psutil calls for CPU, memory and disk take time, and cpu_percent only means
+something over an interval, so none of them run in request handlers. A daemon
+thread takes a snapshot every interval into a fixed-size ring. Requests only
+read the latest snapshot, or the ring when history is asked for.
+"""
+
+import os
+import sys
+import time
+import socket
+import platform
+import threading
+from collections import deque
+from datetime import datetime
+
+import psutil
+
+
+class StatusSampler:
+    """
+    Periodic snapshots of host, process, database pool and request load.
+
+    Args:
+        app: Flask application
+        db: Flask-SQLAlchemy instance
+        metrics (RequestMetrics, optional): Source of request and error
+            counts. Defaults to None (no request rates).
+        interval (float, optional): Seconds between snapshots. Defaults to 5.
+        history (int, optional): Snapshots kept in the ring. Defaults to 120.
+        disk_path (str, optional): Filesystem reported for disk usage. Defaults to "/".
+        started_at (datetime, optional): Application start time. Defaults to now.
+    """
+
+    def __init__(self, app, db, metrics=None, interval=5.0, history=120, disk_path="/", started_at=None):
+        self.app = app
+        self.db = db
+        self.metrics = metrics
+        self.interval = interval
+        self.disk_path = disk_path
+
+        self.started_at = started_at or datetime.now()
+        self.host = {
+            "hostname": socket.gethostname(),
+            "platform": platform.platform(),
+            "python": sys.version.split()[0],
+            "cpu_count": psutil.cpu_count(),
+        }
+        self.samples = deque(maxlen=history)
+        self.latest = None
+
+        self._process = psutil.Process()
+        self._previous = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def start(self):
+        """
+        Start the sampling thread if it isn't running in this process.
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            # psutil.Process caches the pid, so refresh it after a fork
+            self._process = psutil.Process()
+            self._previous = None
+            self._thread = threading.Thread(target=self._run, name="status-sampler", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        # Prime the CPU counters so the first snapshot covers a full interval
+        psutil.cpu_percent(interval=None)
+        self._process.cpu_percent(interval=None)
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"Status sampler error: {e}")
+
+    def sample(self):
+        """
+        Take one snapshot and push it onto the ring.
+
+        Returns:
+            dict: The new snapshot
+        """
+        now = time.time()
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.disk_path)
+        process_memory = self._process.memory_info()
+
+        snapshot = {
+            "timestamp": now,
+            "cpu": {
+                "percent": psutil.cpu_percent(interval=None),
+                "load_average": list(os.getloadavg()) if hasattr(os, "getloadavg") else None,
+            },
+            "memory": {
+                "total": memory.total,
+                "used": memory.used,
+                "available": memory.available,
+                "percent": memory.percent,
+            },
+            "disk": {
+                "path": self.disk_path,
+                "total": disk.total,
+                "used": disk.used,
+                "free": disk.free,
+                "percent": disk.percent,
+            },
+            "process": {
+                "pid": os.getpid(),
+                "rss": process_memory.rss,
+                "cpu_percent": self._process.cpu_percent(interval=None),
+                "threads": self._process.num_threads(),
+            },
+            "db_pool": self._pool_status(),
+            "requests": self._request_rates(now),
+        }
+
+        self.samples.append(snapshot)
+        self.latest = snapshot
+        return snapshot
+
+    def _pool_status(self):
+        with self.app.app_context():
+            pool = self.db.engine.pool
+        status = {"class": type(pool).__name__}
+        # SQLite's default pools don't track checkouts
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, name, None)
+            if method is not None:
+                status[name] = method()
+        return status
+
+    def _request_rates(self, now):
+        if self.metrics is None:
+            return None
+
+        requests = errors = 0
+        for (name, labels), value in self.metrics.local_snapshot().items():
+            if name != "http_requests_total":
+                continue
+            requests += value
+            if dict(labels).get("status", "").startswith("5"):
+                errors += value
+
+        previous, self._previous = self._previous, (now, requests, errors)
+        if previous is None or now <= previous[0]:
+            return {"total": int(requests), "errors": int(errors), "per_second": None, "errors_per_second": None}
+        elapsed = now - previous[0]
+        return {
+            "total": int(requests),
+            "errors": int(errors),
+            "per_second": round((requests - previous[1]) / elapsed, 3),
+            "errors_per_second": round((errors - previous[2]) / elapsed, 3),
+        }
+
+    def status(self, history=False):
+        """
+        Read the latest snapshot, starting the sampler if needed. Only the
+        very first call in a process samples inline.
+
+        Args:
+            history (bool, optional): Include every snapshot in the ring. Defaults to False.
+
+        Returns:
+            dict: Static host info, uptime and the latest snapshot
+        """
+        self.start()
+        latest = self.latest
+        if latest is None:
+            latest = self.sample()
+
+        status = {
+            **self.host,
+            "started_at": self.started_at.isoformat(),
+            "uptime_seconds": int((datetime.now() - self.started_at).total_seconds()),
+            "interval": self.interval,
+            "latest": latest,
+        }
+        if history:
+            status["history"] = list(self.samples)
+        return status
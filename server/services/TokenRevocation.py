@@ -0,0 +1,339 @@
+"""
+JWT revocation by jti with an in-process Bloom filter in front of the store.
+
+Almost every token checked was never revoked. Each process keeps a Bloom
+filter of revoked jtis, so that case is answered from memory. Only filter
+hits, which are real revocations or rare false positives, are confirmed
+against the store. The filter is refreshed from the store in the background,
+so revocations made by other workers are picked up within sync_interval.
+"""
+
+import os
+import math
+import time
+import hashlib
+import threading
+from datetime import datetime, timezone
+
+from services.RespClient import RespClient, RespError
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Args:
+        capacity (int): Expected number of items
+        error_rate (float): Target false positive rate at capacity
+    """
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        with self._lock:
+            for position in self._positions(item):
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def __contains__(self, item):
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class MemoryTokenStore:
+    """
+    Per-process store. Only suitable for a single worker process.
+    """
+
+    def __init__(self):
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def add(self, jti, expires):
+        with self._lock:
+            self._tokens[jti] = (expires, time.time())
+
+    def contains(self, jti):
+        entry = self._tokens.get(jti)
+        return entry is not None and entry[0] > time.time()
+
+    def revoked_since(self, since):
+        now = time.time()
+        with self._lock:
+            for jti in [jti for jti, (expires, _) in self._tokens.items() if expires <= now]:
+                del self._tokens[jti]
+            return [jti for jti, (_, revoked) in self._tokens.items() if since is None or revoked >= since]
+
+
+class SqlAlchemyTokenStore:
+    """
+    Store backed by the revoked_tokens table, shared by every worker.
+    Expired rows are deleted in batches during full syncs.
+
+    Args:
+        app: Flask application
+        db: Flask-SQLAlchemy instance
+        batch_size (int, optional): Expired rows deleted per statement. Defaults to 1000.
+    """
+
+    def __init__(self, app, db, batch_size=1000):
+        self.app = app
+        self.db = db
+        self.batch_size = batch_size
+
+    def _datetime(self, timestamp):
+        # Always UTC, so values compare correctly on SQLite where the offset isn't stored
+        return datetime.fromtimestamp(timestamp, timezone.utc)
+
+    def add(self, jti, expires):
+        from sqlalchemy.dialects import postgresql, sqlite
+        from models.RevokedToken import RevokedToken
+
+        table = RevokedToken.__table__
+        row = {"jti": jti, "expires_at": self._datetime(expires), "revoked_at": self._datetime(time.time())}
+
+        # Own connection and transaction, so the caller's pending work is
+        # neither committed early nor able to roll the revocation back
+        with self.db.engine.begin() as conn:
+            dialect = conn.dialect.name
+            if dialect in ("postgresql", "sqlite"):
+                insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+                conn.execute(insert(table).values(**row).on_conflict_do_nothing(index_elements=[table.c.jti]))
+            elif conn.execute(self.db.select(table.c.jti).where(table.c.jti == jti)).first() is None:
+                conn.execute(table.insert().values(**row))
+
+    def contains(self, jti):
+        from models.RevokedToken import RevokedToken
+
+        # Compared in SQL: SQLite returns naive datetimes that .timestamp() would read as local time
+        return self.db.session.execute(
+            self.db.select(RevokedToken.jti).where(
+                RevokedToken.jti == jti, RevokedToken.expires_at > self._datetime(time.time())
+            )
+        ).first() is not None
+
+    def revoked_since(self, since):
+        from models.RevokedToken import RevokedToken
+
+        with self.app.app_context():
+            session = self.db.session
+            try:
+                now = self._datetime(time.time())
+                if since is None:
+                    self._purge(session, now)
+                query = self.db.select(RevokedToken.jti).where(RevokedToken.expires_at > now)
+                if since is not None:
+                    query = query.where(RevokedToken.revoked_at >= self._datetime(since))
+                return session.execute(query).scalars().all()
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.remove()
+
+    def _purge(self, session, now):
+        from models.RevokedToken import RevokedToken
+
+        while True:
+            expired = (
+                self.db.select(RevokedToken.jti)
+                .where(RevokedToken.expires_at <= now)
+                .limit(self.batch_size)
+                .scalar_subquery()
+            )
+            deleted = session.execute(
+                self.db.delete(RevokedToken).where(RevokedToken.jti.in_(expired))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            session.commit()
+            if deleted < self.batch_size:
+                break
+
+
+class RedisTokenStore:
+    """
+    Store in a Redis-protocol server. Each jti key expires with its token.
+    An index set of jtis is kept for syncing; it expires max_ttl after the
+    last revocation, and stale members only cost a confirmation lookup.
+
+    Args:
+        url (str): redis://host:port/db URL
+        max_ttl (float, optional): Longest token lifetime in seconds. Defaults to 30 days.
+        prefix (str, optional): Key prefix. Defaults to "revoked:".
+    """
+
+    def __init__(self, url, max_ttl=30 * 24 * 3600, prefix="revoked:"):
+        self.client = RespClient(url)
+        self.max_ttl = max_ttl
+        self.prefix = prefix
+
+    def add(self, jti, expires):
+        ttl_ms = max(int((expires - time.time()) * 1000), 1)
+        self.client.execute("SET", f"{self.prefix}jti:{jti}", 1, "PX", ttl_ms)
+        self.client.execute("SADD", f"{self.prefix}index", jti)
+        self.client.execute("PEXPIRE", f"{self.prefix}index", int(self.max_ttl * 1000))
+
+    def contains(self, jti):
+        return self.client.execute("GET", f"{self.prefix}jti:{jti}") is not None
+
+    def revoked_since(self, since):
+        return self.client.execute("SMEMBERS", f"{self.prefix}index") or []
+
+
+class TokenRevocation:
+    """
+    Revocation checks for flask_jwt_extended's token_in_blocklist_loader.
+
+    Args:
+        store: MemoryTokenStore, SqlAlchemyTokenStore or RedisTokenStore
+        capacity (int, optional): Revoked tokens the filter is sized for. Defaults to 100000.
+        error_rate (float, optional): Filter false positive rate at capacity. Defaults to 0.001.
+        sync_interval (float, optional): Seconds between incremental syncs. Defaults to 5.
+        rebuild_interval (float, optional): Seconds between full rebuilds, which
+            drop expired tokens from the filter. Defaults to 300.
+    """
+
+    def __init__(self, store, capacity=100000, error_rate=0.001, sync_interval=5.0, rebuild_interval=300.0):
+        self.store = store
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+
+        self.checks = 0
+        self.store_checks = 0
+        self.revoked = 0
+
+        self.bloom = BloomFilter(capacity, error_rate)
+        self._synced_at = None
+        self._rebuilt_at = 0.0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def start(self):
+        """
+        Start the sync thread if it isn't running in this process.
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._thread = threading.Thread(target=self._run, name="token-revocation-sync", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.sync()
+            except Exception as e:
+                print(f"Token revocation sync error: {e}")
+            time.sleep(self.sync_interval)
+
+    def sync(self):
+        """
+        Add tokens revoked since the last sync to the filter, or rebuild it
+        from every unexpired revocation when a rebuild is due.
+        """
+        # Overlap with the previous sync so revocations committed during it aren't missed
+        started = time.time() - self.sync_interval
+
+        if self._synced_at is None or time.monotonic() - self._rebuilt_at >= self.rebuild_interval:
+            jtis = self.store.revoked_since(None)
+            bloom = BloomFilter(max(self.capacity, len(jtis) * 2), self.error_rate)
+            for jti in jtis:
+                bloom.add(jti)
+            self.bloom = bloom
+            self._rebuilt_at = time.monotonic()
+        else:
+            for jti in self.store.revoked_since(self._synced_at):
+                if jti not in self.bloom:
+                    self.bloom.add(jti)
+
+        self._synced_at = started
+
+    def revoke(self, jti, expires):
+        """
+        Revoke one token until it expires.
+
+        Args:
+            jti (str): Token ID
+            expires (float): Token expiry as a Unix timestamp
+        """
+        if expires <= time.time():
+            return
+        self.store.add(jti, expires)
+        self.bloom.add(jti)
+        self.revoked += 1
+
+    def is_revoked(self, jti):
+        """
+        Check whether a token has been revoked.
+
+        Args:
+            jti (str): Token ID
+
+        Returns:
+            bool: True if revoked. If the store can't be reached to confirm
+                a filter hit, the token is treated as revoked.
+        """
+        self.start()
+        self.checks += 1
+        # Until the first sync has filled the filter every check goes to the store
+        if self._synced_at is not None and jti not in self.bloom:
+            return False
+
+        self.store_checks += 1
+        try:
+            return self.store.contains(jti)
+        except RespError as e:
+            print(f"Token revocation store unavailable: {e}")
+            return True
+
+    def stats(self):
+        """
+        Returns:
+            dict: Check counts and filter fill
+        """
+        return {
+            "checks": self.checks,
+            "store_checks": self.store_checks,
+            "revoked": self.revoked,
+            "filter_items": self.bloom.count,
+            "filter_bits": self.bloom.size,
+        }
+
+
+def create_token_revocation(name, app=None, db=None, url=None, max_ttl=30 * 24 * 3600, **kwargs):
+    """
+    Build token revocation over a store chosen by name.
+
+    Args:
+        name (str): One of "sqlalchemy", "memory" or "redis"
+        app: Flask application, for the sqlalchemy store
+        db: Flask-SQLAlchemy instance, for the sqlalchemy store
+        url (str, optional): redis:// URL for the redis store
+        max_ttl (float, optional): Longest token lifetime in seconds
+        **kwargs: Passed to TokenRevocation
+
+    Returns:
+        TokenRevocation: Revocation instance
+    """
+    if name == "sqlalchemy":
+        return TokenRevocation(SqlAlchemyTokenStore(app, db), **kwargs)
+    if name == "memory":
+        return TokenRevocation(MemoryTokenStore(), **kwargs)
+    if name == "redis":
+        return TokenRevocation(RedisTokenStore(url or "redis://127.0.0.1:6379/0", max_ttl), **kwargs)
+    raise ValueError(f"Unknown token revocation store: {name}")
@@ -0,0 +1,102 @@
+"""
+Search backends for the user table.
+
+All backends match the search term as a case-insensitive substring of
+username, email, id, first_name or last_name and return a relevance
+expression (higher is better). The backend is picked from the engine dialect.
+"""
+
+from functools import lru_cache
+
+from sqlalchemy import or_, func, inspect, literal_column, text, Float, Integer
+
+
+SEARCH_COLUMNS = ("username", "email", "id", "first_name", "last_name")
+
+
+class LikeSearch:
+    """
+    Portable fallback: OR of lower(column) LIKE '%term%' predicates.
+    """
+
+    name = "like"
+
+    def _columns(self, model):
+        return [getattr(model, column) for column in SEARCH_COLUMNS]
+
+    def filter(self, query, model, term):
+        """
+        Restrict a user query to rows matching the search term.
+
+        Args:
+            query: User query
+            model: User model class
+            term (str): Lowercased search term
+
+        Returns:
+            Tuple of (filtered query, relevance expression or None)
+        """
+        query = query.filter(
+            or_(*[func.lower(column).contains(term) for column in self._columns(model)])
+        )
+        return query, None
+
+
+class TrigramSearch(LikeSearch):
+    """
+    Postgres backend. The LIKE predicates are served by pg_trgm GIN indexes
+    on lower(column) and results are ranked by trigram similarity.
+    """
+
+    name = "pg_trgm"
+
+    def filter(self, query, model, term):
+        query, _ = super().filter(query, model, term)
+        rank = func.greatest(
+            *[func.similarity(func.coalesce(func.lower(column), ""), term) for column in self._columns(model)]
+        )
+        return query, rank
+
+
+class Fts5Search(LikeSearch):
+    """
+    SQLite backend using the users_fts FTS5 table with the trigram tokenizer.
+    Terms shorter than a trigram fall back to LIKE.
+    """
+
+    name = "fts5"
+    MIN_TERM_LENGTH = 3
+
+    def filter(self, query, model, term):
+        if len(term) < self.MIN_TERM_LENGTH:
+            return super().filter(query, model, term)
+
+        # Quote the term as a phrase so FTS5 operators are matched literally
+        match = '"' + term.replace('"', '""') + '"'
+        matches = (
+            text("SELECT rowid, bm25(users_fts) AS rank FROM users_fts WHERE users_fts MATCH :match")
+            .bindparams(match=match)
+            .columns(rowid=Integer, rank=Float)
+            .subquery("users_fts_match")
+        )
+        query = query.join(matches, literal_column(f"{model.__tablename__}.rowid") == matches.c.rowid)
+        # bm25 scores are lower for better matches
+        return query, -matches.c.rank
+
+
+@lru_cache(maxsize=None)
+def get_user_search(engine):
+    """
+    Pick the search backend for an engine.
+
+    Args:
+        engine: SQLAlchemy engine
+
+    Returns:
+        LikeSearch: Backend instance
+    """
+    if engine.dialect.name == "postgresql":
+        return TrigramSearch()
+    if engine.dialect.name == "sqlite" and inspect(engine).has_table("users_fts"):
+        return Fts5Search()
+    return LikeSearch()
@@ -5,6 +5,7 @@ Flask Application for ClockwiseCPA - Enhanced Dashboard
 import os
 import time
 import uuid
+import secrets
 import bcrypt
 import psutil
 import platform
@@ -22,18 +23,36 @@ from sqlalchemy import create_engine, MetaData, text, func
 
 
 # Flask imports
-from flask import Flask, render_template, request, make_response, jsonify, redirect, url_for
+from flask import Flask, render_template, request, make_response, jsonify, redirect, url_for, Response, stream_with_context, send_from_directory
 from flask_cors import CORS
 from flask_jwt_extended import (
     JWTManager, jwt_required, get_jwt_identity, 
     unset_access_cookies, unset_refresh_cookies, 
     create_access_token, create_refresh_token, 
-    set_access_cookies, set_refresh_cookies, get_jwt, verify_jwt_in_request
+    set_access_cookies, set_refresh_cookies, get_jwt, verify_jwt_in_request,
+    decode_token
 )
 from flask_migrate import Migrate
 from flask_restful import Api, Resource
 from flask_sqlalchemy import SQLAlchemy
-
+from werkzeug.http import quote_etag
+
+# Local imports
+from services.PasswordHasher import PasswordHasher, PasswordHasherBusy
+from services.UserCache import UserCache
+from services.ResponseCache import ResponseCache
+from services.EmailTransport import create_transport
+from services.EmailWorker import OutboxWorker, CircuitBreaker
+from services.AuthCodeSweeper import AuthCodeSweeper
+from services.LoginActivityBuffer import LoginActivityBuffer
+from services.AuditWriter import AuditWriter
+from services.RateLimiter import create_rate_limiter, parse_rule
+from services.ConcurrencyLimiter import ConcurrencyLimiter, parse_limits
+from services.TokenRevocation import create_token_revocation
+from services.Metrics import RequestMetrics
+from services.SqlProfiler import SqlProfiler, parse_budgets
+from services.RequestProfiler import RequestProfiler
+from services.StatusSampler import StatusSampler
 
 # ------------------------
 # Application Configuration
@@ -64,6 +83,102 @@ app.config['JWT_SECRET_KEY'] = os.environ.get("KEY")
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(weeks=1)
 app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(weeks=3)
 
+# Password hashing configuration (bcrypt runs on a process pool)
+app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+app.config['PASSWORD_HASH_QUEUE_SIZE'] = int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE', 32))
+app.config['PASSWORD_HASH_TIMEOUT'] = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+
+# User identity cache configuration (used by check_user_exists)
+app.config['USER_CACHE_SIZE'] = int(os.environ.get('USER_CACHE_SIZE', 1024))
+app.config['USER_CACHE_TTL'] = float(os.environ.get('USER_CACHE_TTL', 30))
+
+# GET /users response cache configuration
+app.config['USER_LIST_CACHE_SIZE'] = int(os.environ.get('USER_LIST_CACHE_SIZE', 256))
+app.config['USER_LIST_CACHE_TTL'] = float(os.environ.get('USER_LIST_CACHE_TTL', 2))
+
+# Email outbox configuration (transport: resend, memory or file). Only
+# development falls back to the memory transport, which never delivers.
+app.config['EMAIL_TRANSPORT'] = os.environ.get('EMAIL_TRANSPORT', 'resend' if RESEND_API_KEY or PROD else 'memory')
+app.config['EMAIL_OUTBOX_FILE'] = os.environ.get('EMAIL_OUTBOX_FILE')
+app.config['EMAIL_BATCH_SIZE'] = int(os.environ.get('EMAIL_BATCH_SIZE', 50))
+app.config['EMAIL_POLL_INTERVAL'] = float(os.environ.get('EMAIL_POLL_INTERVAL', 5))
+app.config['EMAIL_MAX_ATTEMPTS'] = int(os.environ.get('EMAIL_MAX_ATTEMPTS', 6))
+app.config['EMAIL_BREAKER_THRESHOLD'] = int(os.environ.get('EMAIL_BREAKER_THRESHOLD', 5))
+app.config['EMAIL_BREAKER_RESET'] = float(os.environ.get('EMAIL_BREAKER_RESET', 30))
+app.config['EMAIL_LEASE'] = float(os.environ.get('EMAIL_LEASE', 300))
+if app.config['EMAIL_TRANSPORT'] == 'resend' and not RESEND_API_KEY:
+    raise RuntimeError("RESEND_API_KEY is not set. Set it, or set EMAIL_TRANSPORT=memory or file to opt out of delivery")
+if app.config['EMAIL_TRANSPORT'] != 'resend':
+    print(f"Warning: EMAIL_TRANSPORT is '{app.config['EMAIL_TRANSPORT']}', 2FA and reset emails will not be delivered")
+
+# Expired auth code sweeper configuration
+app.config['AUTH_CODE_SWEEP_INTERVAL'] = float(os.environ.get('AUTH_CODE_SWEEP_INTERVAL', 60))
+app.config['AUTH_CODE_SWEEP_BATCH_SIZE'] = int(os.environ.get('AUTH_CODE_SWEEP_BATCH_SIZE', 1000))
+
+# Auth code store configuration (sqlalchemy, memory, sqlite or redis)
+app.config['AUTH_CODE_STORE'] = os.environ.get('AUTH_CODE_STORE', 'sqlalchemy')
+app.config['AUTH_CODE_STORE_URL'] = os.environ.get('AUTH_CODE_STORE_URL')
+app.config['AUTH_CODE_TTL'] = float(os.environ.get('AUTH_CODE_TTL', 300))
+
+# Login activity write-behind configuration
+app.config['LOGIN_ACTIVITY_FLUSH_MS'] = int(os.environ.get('LOGIN_ACTIVITY_FLUSH_MS', 500))
+app.config['LOGIN_ACTIVITY_MAX_ITEMS'] = int(os.environ.get('LOGIN_ACTIVITY_MAX_ITEMS', 500))
+app.config['LOGIN_ACTIVITY_ENABLED'] = os.environ.get('LOGIN_ACTIVITY_ENABLED', '').lower() in ('1', 'true', 'yes')
+
+# Audit log writer configuration
+app.config['AUDIT_BATCH_SIZE'] = int(os.environ.get('AUDIT_BATCH_SIZE', 500))
+app.config['AUDIT_FLUSH_MS'] = int(os.environ.get('AUDIT_FLUSH_MS', 1000))
+app.config['AUDIT_QUEUE_SIZE'] = int(os.environ.get('AUDIT_QUEUE_SIZE', 10000))
+app.config['AUDIT_RETENTION_DAYS'] = int(os.environ.get('AUDIT_RETENTION_DAYS', 365))
+app.config['AUDIT_MAINTENANCE_INTERVAL'] = int(os.environ.get('AUDIT_MAINTENANCE_INTERVAL', 3600))
+
+# Rate limit configuration (store: memory or redis, rules are "count/seconds")
+app.config['RATE_LIMIT_ENABLED'] = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+app.config['RATE_LIMIT_STORE'] = os.environ.get('RATE_LIMIT_STORE', 'memory')
+app.config['RATE_LIMIT_STORE_URL'] = os.environ.get('RATE_LIMIT_STORE_URL')
+app.config['RATE_LIMIT_RULES'] = {
+    'login_ip': parse_rule(os.environ.get('RATE_LIMIT_LOGIN_IP', '20/60')),
+    'login_user': parse_rule(os.environ.get('RATE_LIMIT_LOGIN_USER', '5/300')),
+    'login_code_ip': parse_rule(os.environ.get('RATE_LIMIT_LOGIN_CODE_IP', '10/300')),
+    'reset_ip': parse_rule(os.environ.get('RATE_LIMIT_RESET_IP', '10/300')),
+    'reset_email': parse_rule(os.environ.get('RATE_LIMIT_RESET_EMAIL', '3/900')),
+}
+
+# Per-resource concurrency limits ("Resource=max_in_flight:queue_depth,...")
+app.config['CONCURRENCY_LIMITS'] = parse_limits(os.environ.get('CONCURRENCY_LIMITS', 'Login=8:32,ResetPassword=4:16,UserImport=2:4'))
+app.config['CONCURRENCY_QUEUE_TIMEOUT_MS'] = int(os.environ.get('CONCURRENCY_QUEUE_TIMEOUT_MS', 2000))
+
+# JWT revocation configuration (store: sqlalchemy, memory or redis)
+app.config['JWT_REVOCATION_STORE'] = os.environ.get('JWT_REVOCATION_STORE', 'sqlalchemy')
+app.config['JWT_REVOCATION_STORE_URL'] = os.environ.get('JWT_REVOCATION_STORE_URL')
+app.config['JWT_REVOCATION_CAPACITY'] = int(os.environ.get('JWT_REVOCATION_CAPACITY', 100000))
+app.config['JWT_REVOCATION_SYNC_SECONDS'] = float(os.environ.get('JWT_REVOCATION_SYNC_SECONDS', 5))
+
+# Prometheus metrics configuration (set METRICS_DIR when running several worker processes)
+app.config['METRICS_DIR'] = os.environ.get('METRICS_DIR')
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+
+# SQL profiler configuration (development and tests; budgets are "Resource=statements,...")
+app.config['SQL_PROFILER_ENABLED'] = os.environ.get('SQL_PROFILER_ENABLED', '').lower() in ('1', 'true', 'yes')
+app.config['SQL_SLOW_QUERY_MS'] = float(os.environ.get('SQL_SLOW_QUERY_MS', 100))
+app.config['SQL_REPEAT_THRESHOLD'] = int(os.environ.get('SQL_REPEAT_THRESHOLD', 5))
+app.config['SQL_EXPLAIN'] = os.environ.get('SQL_EXPLAIN', 'true').lower() in ('1', 'true', 'yes')
+app.config['SQL_QUERY_BUDGETS'] = parse_budgets(os.environ.get('SQL_QUERY_BUDGETS', ''))
+app.config['SQL_BUDGET_STRICT'] = os.environ.get('SQL_BUDGET_STRICT', '').lower() in ('1', 'true', 'yes')
+
+# Request profiler configuration (mode: sample or cprofile; off unless a secret, admins or a sample rate is set)
+app.config['PROFILE_DIR'] = os.environ.get('PROFILE_DIR', os.path.join(app.instance_path, 'profiles'))
+app.config['PROFILE_SECRET'] = os.environ.get('PROFILE_SECRET')
+app.config['PROFILE_ADMINS'] = [user_id.strip() for user_id in os.environ.get('PROFILE_ADMINS', '').split(',') if user_id.strip()]
+app.config['PROFILE_SAMPLE_EVERY'] = int(os.environ.get('PROFILE_SAMPLE_EVERY', 0))
+app.config['PROFILE_MODE'] = os.environ.get('PROFILE_MODE', 'sample')
+app.config['PROFILE_RING_SIZE'] = int(os.environ.get('PROFILE_RING_SIZE', 50))
+
+# System status sampler configuration (dashboard and /status)
+app.config['STATUS_SAMPLE_INTERVAL'] = float(os.environ.get('STATUS_SAMPLE_INTERVAL', 5))
+app.config['STATUS_HISTORY'] = int(os.environ.get('STATUS_HISTORY', 120))
+app.config['STATUS_DISK_PATH'] = os.environ.get('STATUS_DISK_PATH', '/')
+
 # Development vs Production JWT settings
 if PROD:
     app.config['JWT_COOKIE_SAMESITE'] = 'None'
@@ -82,7 +197,8 @@ cors = CORS(app,
     supports_credentials=True,
     # origins='*',
     origins=['http://localhost:3000', 'http://127.0.0.1:3001','http://127.0.0.1:3000','http://localhost:3001'],
-    allow_headers=["Content-Type", "Authorization", "X-CSRF-TOKEN","x-csrf-token"],
+    allow_headers=["Content-Type", "Authorization", "X-CSRF-TOKEN","x-csrf-token", "If-None-Match", "If-Match"],
+    expose_headers=["ETag", "Retry-After"],
     methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH", "HEAD"],
 )
 
@@ -102,9 +218,130 @@ migrate = Migrate(app, db)
 api = Api(app)
 jwt = JWTManager(app)
 
+# Password hashing pool
+password_hasher = PasswordHasher(
+    max_workers=app.config['PASSWORD_HASH_WORKERS'],
+    queue_size=app.config['PASSWORD_HASH_QUEUE_SIZE'],
+    timeout=app.config['PASSWORD_HASH_TIMEOUT'],
+)
+
+# User identity cache, invalidated by User update/delete events
+user_cache = UserCache(
+    maxsize=app.config['USER_CACHE_SIZE'],
+    ttl=app.config['USER_CACHE_TTL'],
+)
+
+# GET /users response cache, invalidated by User insert/update/delete
+user_list_cache = ResponseCache(
+    maxsize=app.config['USER_LIST_CACHE_SIZE'],
+    ttl=app.config['USER_LIST_CACHE_TTL'],
+)
+
 # Set Resend API key (For 2fa emails)
 resend.api_key = RESEND_API_KEY
 
+# Email outbox worker (2FA and password reset emails)
+email_worker = OutboxWorker(
+    app, db,
+    create_transport(
+        app.config['EMAIL_TRANSPORT'],
+        api_key=RESEND_API_KEY,
+        path=app.config['EMAIL_OUTBOX_FILE'],
+    ),
+    batch_size=app.config['EMAIL_BATCH_SIZE'],
+    poll_interval=app.config['EMAIL_POLL_INTERVAL'],
+    max_attempts=app.config['EMAIL_MAX_ATTEMPTS'],
+    lease=app.config['EMAIL_LEASE'],
+    breaker=CircuitBreaker(
+        failure_threshold=app.config['EMAIL_BREAKER_THRESHOLD'],
+        reset_timeout=app.config['EMAIL_BREAKER_RESET'],
+    ),
+)
+
+# Expired auth code sweeper, started when the first code is issued
+auth_code_sweeper = AuthCodeSweeper(
+    app, db,
+    interval=app.config['AUTH_CODE_SWEEP_INTERVAL'],
+    batch_size=app.config['AUTH_CODE_SWEEP_BATCH_SIZE'],
+)
+
+# Buffered last_login / login activity writes
+login_activity = LoginActivityBuffer(
+    app, db,
+    flush_interval=app.config['LOGIN_ACTIVITY_FLUSH_MS'] / 1000,
+    max_items=app.config['LOGIN_ACTIVITY_MAX_ITEMS'],
+    record_activity=app.config['LOGIN_ACTIVITY_ENABLED'],
+)
+
+# Batched audit log writer, started when the first event is recorded
+audit_writer = AuditWriter(
+    app, db,
+    batch_size=app.config['AUDIT_BATCH_SIZE'],
+    flush_interval=app.config['AUDIT_FLUSH_MS'] / 1000,
+    queue_size=app.config['AUDIT_QUEUE_SIZE'],
+    retention_days=app.config['AUDIT_RETENTION_DAYS'],
+    maintenance_interval=app.config['AUDIT_MAINTENANCE_INTERVAL'],
+)
+
+# Login, 2FA and password reset rate limits
+rate_limiter = create_rate_limiter(
+    app.config['RATE_LIMIT_STORE'],
+    app.config['RATE_LIMIT_RULES'],
+    url=app.config['RATE_LIMIT_STORE_URL'],
+    enabled=app.config['RATE_LIMIT_ENABLED'],
+)
+
+# Load shedding for the resources listed in CONCURRENCY_LIMITS (applied in main.py)
+concurrency_limiter = ConcurrencyLimiter(
+    app.config['CONCURRENCY_LIMITS'],
+    queue_timeout=app.config['CONCURRENCY_QUEUE_TIMEOUT_MS'] / 1000,
+)
+
+# Revoked JWTs, checked through the token_in_blocklist_loader below
+token_revocation = create_token_revocation(
+    app.config['JWT_REVOCATION_STORE'],
+    app=app, db=db,
+    url=app.config['JWT_REVOCATION_STORE_URL'],
+    capacity=app.config['JWT_REVOCATION_CAPACITY'],
+    sync_interval=app.config['JWT_REVOCATION_SYNC_SECONDS'],
+)
+
+# Per-resource request and SQL metrics, served at /metrics
+request_metrics = RequestMetrics(directory=app.config['METRICS_DIR'])
+request_metrics.init_app(app)
+
+# N+1, slow query and query budget checks, only hooked in when SQL_PROFILER_ENABLED is set
+sql_profiler = SqlProfiler(
+    enabled=app.config['SQL_PROFILER_ENABLED'],
+    slow_ms=app.config['SQL_SLOW_QUERY_MS'],
+    repeat_threshold=app.config['SQL_REPEAT_THRESHOLD'],
+    explain=app.config['SQL_EXPLAIN'],
+    budgets=app.config['SQL_QUERY_BUDGETS'],
+    strict=app.config['SQL_BUDGET_STRICT'],
+)
+sql_profiler.init_app(app)
+
+# On-demand and 1-in-N request profiling, written to PROFILE_DIR
+request_profiler = RequestProfiler(
+    app.config['PROFILE_DIR'],
+    secret=app.config['PROFILE_SECRET'],
+    admins=app.config['PROFILE_ADMINS'],
+    sample_every=app.config['PROFILE_SAMPLE_EVERY'],
+    mode=app.config['PROFILE_MODE'],
+    ring_size=app.config['PROFILE_RING_SIZE'],
+)
+request_profiler.init_app(app)
+
+# Host, process, pool and request rate snapshots, started on the first status read
+status_sampler = StatusSampler(
+    app, db,
+    metrics=request_metrics,
+    interval=app.config['STATUS_SAMPLE_INTERVAL'],
+    history=app.config['STATUS_HISTORY'],
+    disk_path=app.config['STATUS_DISK_PATH'],
+    started_at=start_time,
+)
+
 # ------------------------
 # Utility Functions
 # ------------------------
@@ -141,26 +378,23 @@ def format_bytes(bytes_value):
         bytes_value /= 1024.0
     return f"{bytes_value:.1f} PB"
 
-def generate_unique_uuid(cls, length=8):
+def generate_code(length=8):
     """
-    Generate a unique UUID of specified length.
+    Generate a random hex code without checking for collisions.
+    Callers rely on the primary key constraint and retry on conflict.
 
     Args:
-        cls: Class to check for existing UUIDs.
-        length (int, optional): Length of the UUID. Defaults to 8.
+        length (int, optional): Length of the code. Defaults to 8.
 
     Returns:
-        str: Unique UUID.
+        str: Random code.
     """
-    while True:
-        new_uuid = str(uuid.uuid4())[:8]
-        existing_instance = cls.query.filter_by(id=new_uuid).first()
-        if not existing_instance:
-            return new_uuid
+    return secrets.token_hex((length + 1) // 2)[:length]
 
 def check_user_exists(func):
     """
     Decorator to check if a user exists in the database.
+    The user's row is served from user_cache when possible.
 
     Args:
         func (function): Function to be decorated.
@@ -171,12 +405,100 @@ def check_user_exists(func):
     from models.User import User
     @wraps(func)
     def wrapper(*args, **kwargs):
-        if user := db.session.query(User).filter_by(id=get_jwt_identity()).first():
+        identity = get_jwt_identity()
+        if snapshot := user_cache.get(identity):
+            user = User.from_snapshot(snapshot)
+        elif user := db.session.query(User).filter_by(id=identity).first():
+            user_cache.set(identity, user.to_snapshot())
+
+        if user:
             return func(*args, user, **kwargs)
         else:
             return {'error': 'User not found'}, 404
     return wrapper
 
+def rate_limit(**keys):
+    """
+    Count a request against the named rate limit rules.
+
+    Args:
+        **keys: Rule name to the key being limited, e.g. login_ip=request.remote_addr
+
+    Returns:
+        tuple: A 429 response with Retry-After if a limit was hit, otherwise None
+    """
+    retry_after = rate_limiter.hit(**keys)
+    if retry_after:
+        return {'error': 'Too many attempts, please try again later'}, 429, {'Retry-After': str(retry_after)}
+    return None
+
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header, jwt_payload):
+    """
+    Reject tokens revoked by jti or issued before the user's sessions were
+    revoked. token_version is read from the database on every check rather
+    than from user_cache: the cache is per process, so another worker's
+    revoke_sessions() would go unnoticed here until the entry expired.
+
+    Args:
+        jwt_header (dict): Decoded JWT header
+        jwt_payload (dict): Decoded JWT claims
+
+    Returns:
+        bool: True if the token must be rejected
+    """
+    from models.User import User
+
+    if token_revocation.is_revoked(jwt_payload['jti']):
+        return True
+
+    # A single indexed column on the primary key
+    token_version = db.session.execute(
+        db.select(User.token_version).where(User.id == jwt_payload['sub'])
+    ).scalar()
+    if token_version is None:
+        # Left to check_user_exists, which answers 404
+        return False
+
+    return jwt_payload.get('ver', 0) != token_version
+
+def revoke_token(jwt_payload):
+    """
+    Revoke one decoded token until it expires.
+
+    Args:
+        jwt_payload (dict): Decoded JWT claims
+    """
+    token_revocation.revoke(jwt_payload['jti'], jwt_payload['exp'])
+
+def etag_header(etag, weak=False):
+    """
+    Build the ETag response header for an unquoted ETag value.
+
+    Args:
+        etag (str): ETag value
+        weak (bool, optional): Mark the ETag as weak. Defaults to False.
+
+    Returns:
+        dict: Headers to return with the response
+    """
+    return {'ETag': quote_etag(etag, weak)}
+
+def not_modified(etag, weak=False):
+    """
+    Answer a conditional GET whose If-None-Match matches the current ETag.
+
+    Args:
+        etag (str): Current ETag value
+        weak (bool, optional): Whether the ETag is weak. Defaults to False.
+
+    Returns:
+        Response: An empty 304 response if the client's copy is current, otherwise None
+    """
+    if request.if_none_match and request.if_none_match.contains_weak(etag):
+        return Response(status=304, headers=etag_header(etag, weak))
+    return None
+
 def check_not_none(*args):
     """
     Checks that all provided arguments are not None.
@@ -206,6 +528,16 @@ def patch_if_exists(keys, data, model):
 # Database Initialization
 # ------------------------
 
+# Auth code store for 2FA and password reset codes (imported here since it
+# uses the utilities above)
+from services.AuthCodeStore import create_auth_code_store
+
+auth_code_store = create_auth_code_store(
+    app.config['AUTH_CODE_STORE'],
+    ttl=app.config['AUTH_CODE_TTL'],
+    url=app.config['AUTH_CODE_STORE_URL'],
+    sweeper=auth_code_sweeper,
+)
     
 START_TIME = current_time()
 
@@ -218,16 +550,122 @@ START_TIME = current_time()
 def home():
     """
     Render the home page with system status dashboard.
-    Requires authentication.
+    The dashboard is only shown to signed-in users.
 
     Returns:
         str: Rendered HTML of the dashboard.
     """
+    # An expired or invalid cookie just means signed out here
+    try:
+        verify_jwt_in_request(optional=True)
+        signed_in = get_jwt_identity() is not None
+    except Exception:
+        signed_in = False
 
     return render_template(
         "landing.html",
+        status=status_sampler.status() if signed_in else None,
+        format_bytes=format_bytes,
     )
 
+@app.route('/status')
+@jwt_required()
+def status():
+    """
+    Report the latest system status snapshot. Snapshots are taken in the
+    background, so this never calls psutil itself.
+
+    Query Parameters:
+        history: (Optional) Include every snapshot in the ring
+
+    Returns:
+        Response: JSON of host info, uptime and the latest snapshot
+    """
+    return jsonify(status_sampler.status(history='history' in request.args))
+
+@app.route('/metrics')
+def metrics():
+    """
+    Expose request and SQL metrics for Prometheus. When METRICS_TOKEN is
+    set, scrapers must send it as a bearer token.
+
+    Returns:
+        Response: Metrics in the Prometheus text format
+    """
+    token = app.config['METRICS_TOKEN']
+    if token and not secrets.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    return Response(request_metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/cache')
+@jwt_required()
+def cache():
+    """
+    Report hit rates for the per-process caches.
+
+    Returns:
+        Response: JSON of cache stats
+    """
+    return jsonify({
+        'user_identity': user_cache.stats(),
+        'user_list': user_list_cache.stats(),
+    })
+
+@app.route('/load')
+@jwt_required()
+def load():
+    """
+    Report in-flight, queued and rejected requests per limited resource.
+
+    Returns:
+        Response: JSON of concurrency limiter stats
+    """
+    return jsonify(concurrency_limiter.stats())
+
+@app.route('/queries')
+@jwt_required()
+def queries():
+    """
+    Report slow statements with their plans, likely N+1 patterns and
+    requests over their query budget.
+
+    Returns:
+        Response: JSON of SQL profiler findings
+    """
+    return jsonify(sql_profiler.stats())
+
+@app.route('/profiles')
+@jwt_required()
+def profiles():
+    """
+    List the request profiles on disk, newest first. Admins only.
+
+    Returns:
+        Response: JSON of profiler stats and profiles
+    """
+    if not request_profiler.is_admin(get_jwt_identity()):
+        return jsonify({'error': 'Forbidden'}), 403
+
+    return jsonify({**request_profiler.stats(), 'profiles': request_profiler.list_profiles()})
+
+@app.route('/profiles/<path:name>')
+@jwt_required()
+def profile(name):
+    """
+    Download one request profile. Admins only.
+
+    Args:
+        name (str): Profile name from X-Profile-Id or /profiles
+
+    Returns:
+        Response: Collapsed stacks or a pstats file
+    """
+    if not request_profiler.is_admin(get_jwt_identity()):
+        return jsonify({'error': 'Forbidden'}), 403
+
+    return send_from_directory(request_profiler.directory, name, as_attachment=True)
+
 # ------------------------
 # Application Entry Point
 # ------------------------
@@ -0,0 +1,48 @@
+"""
+Shared fixtures. setup.py reads its configuration at import time, so the
+environment is pointed at a throwaway SQLite database before it is imported.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "tests.db")
+os.environ["TEST_DB_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ["EMAIL_TRANSPORT"] = "memory"
+os.environ.pop("PROD", None)
+
+
+@pytest.fixture(scope="session")
+def app():
+    from setup import app, db
+
+    with app.app_context():
+        db.create_all()
+    yield app
+
+
+@pytest.fixture
+def user_id(app):
+    """
+    Insert an unlocked user with the password "correct-password" and
+    delete it afterwards.
+    """
+    from setup import db, password_hasher
+    from models.User import User
+
+    with app.app_context():
+        db.session.execute(User.__table__.insert(), [{
+            "id": "1", "username": "hammered", "login_attempts": 0, "locked": False,
+            "password_hash": password_hasher.hash("correct-password"),
+        }])
+        db.session.commit()
+    yield "1"
+    with app.app_context():
+        db.session.execute(User.__table__.delete().where(User.id == "1"))
+        db.session.commit()
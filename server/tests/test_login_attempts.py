@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+
+from setup import db
+from models.User import User
+
+
+def fail_concurrently(app, user_id, threads):
+    """
+    Load the user in each of threads threads, then fail authenticate in all
+    of them at once.
+    """
+    barrier = threading.Barrier(threads)
+    results = []
+
+    def fail_once():
+        with app.app_context():
+            user = db.session.get(User, user_id)
+            barrier.wait()
+            results.append(user.authenticate("wrong-password"))
+            db.session.remove()
+
+    workers = [threading.Thread(target=fail_once) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert results == [False] * threads
+
+
+def read_counter(app, user_id):
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        state = user.login_attempts, user.locked
+        db.session.remove()
+    return state
+
+
+@pytest.mark.parametrize("threads", [2, User.MAX_LOGIN_ATTEMPTS - 1, User.MAX_LOGIN_ATTEMPTS])
+def test_concurrent_failures_are_all_counted(app, user_id, threads):
+    fail_concurrently(app, user_id, threads)
+
+    assert read_counter(app, user_id) == (threads, False)
+
+
+def test_account_locks_past_the_threshold(app, user_id):
+    fail_concurrently(app, user_id, User.MAX_LOGIN_ATTEMPTS)
+    fail_concurrently(app, user_id, User.MAX_LOGIN_ATTEMPTS)
+
+    assert read_counter(app, user_id) == (User.MAX_LOGIN_ATTEMPTS, True)
+
+
+def test_successful_login_resets_the_counter(app, user_id):
+    fail_concurrently(app, user_id, 2)
+
+    with app.app_context():
+        assert db.session.get(User, user_id).authenticate("correct-password") is True
+        db.session.remove()
+    assert read_counter(app, user_id) == (0, False)
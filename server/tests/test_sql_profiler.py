@@ -0,0 +1,127 @@
+from collections import Counter
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+from services.SqlProfiler import SqlProfiler, QueryBudgetExceeded, statement_shape, parse_budgets
+
+
+def run(profiler, *statements):
+    """
+    Feed statements through the profiler as if the engine had executed them.
+    """
+    for statement in statements:
+        profiler._record(None, None, statement, None, False, 0.0)
+
+
+def test_statement_shape_collapses_values():
+    assert statement_shape("SELECT * FROM users WHERE id = 7 AND name = 'o''neil'") == \
+        "SELECT * FROM users WHERE id = ? AND name = ?"
+    assert statement_shape("SELECT * FROM users WHERE id IN (?, ?, ?)") == \
+        statement_shape("SELECT * FROM users WHERE id IN (:id_1)")
+
+
+def test_repeated_shape_is_reported():
+    profiler = SqlProfiler(enabled=True, repeat_threshold=5)
+    profile = profiler._local.profile = Counter()
+    run(profiler, *(f"SELECT * FROM users WHERE id = {i}" for i in range(5)))
+    run(profiler, "SELECT count(*) FROM users")
+
+    profiler._finish("GET /users", "Users", profile, sum(profile.values()))
+
+    assert [(entry["statement"], entry["executions"]) for entry in profiler.repeated] == [
+        ("SELECT * FROM users WHERE id = ?", 5),
+    ]
+
+
+def test_shape_under_threshold_is_not_reported():
+    profiler = SqlProfiler(enabled=True, repeat_threshold=5)
+    profile = profiler._local.profile = Counter()
+    run(profiler, *(f"SELECT * FROM users WHERE id = {i}" for i in range(4)))
+
+    profiler._finish("GET /users", "Users", profile, sum(profile.values()))
+
+    assert not profiler.repeated
+
+
+def test_strict_budget_overrun_raises():
+    profiler = SqlProfiler(enabled=True, budgets={"Users": 3}, strict=True)
+
+    with pytest.raises(QueryBudgetExceeded, match="ran 4 statements, over the budget of 3 for Users"):
+        profiler._finish("GET /users", "Users", Counter({"SELECT ?": 4}), 4)
+    assert profiler.over_budget[-1]["statements"] == 4
+
+
+def test_budget_overrun_is_only_reported_when_not_strict():
+    profiler = SqlProfiler(enabled=True, budgets={"Users": 3})
+
+    profiler._finish("GET /users", "Users", Counter({"SELECT ?": 4}), 4)
+    profiler._finish("GET /users", "Users", Counter({"SELECT ?": 3}), 3)
+
+    assert [entry["statements"] for entry in profiler.over_budget] == [4]
+
+
+def test_budget_context_manager():
+    profiler = SqlProfiler(enabled=True)
+
+    with profiler.budget(3) as profile:
+        run(profiler, "SELECT 1", "SELECT 2", "SELECT 3")
+    assert profile == Counter({"SELECT ?": 3})
+
+    with pytest.raises(QueryBudgetExceeded, match="Ran 4 statements, over the budget of 3: 4x SELECT"):
+        with profiler.budget(3):
+            run(profiler, "SELECT 1", "SELECT 2", "SELECT 3", "SELECT 4")
+
+
+def test_nested_budget_counts_toward_the_outer_one():
+    profiler = SqlProfiler(enabled=True)
+
+    with pytest.raises(QueryBudgetExceeded):
+        with profiler.budget(2):
+            run(profiler, "SELECT 1")
+            with profiler.budget(2):
+                run(profiler, "SELECT 2", "SELECT 3")
+    assert getattr(profiler._local, "profile", None) is None
+
+
+def test_parse_budgets():
+    assert parse_budgets("UserById=4, Users=3,") == {"UserById": 4, "Users": 3}
+
+
+@pytest.fixture(scope="module")
+def profiled_app():
+    # init_app listens on every Engine, so one profiler is shared by these tests
+    profiler = SqlProfiler(enabled=True, budgets={"lookups": 3}, strict=True)
+    engine = create_engine("sqlite://")
+    with engine.connect():
+        pass  # Connect once up front so dialect setup isn't counted
+    app = Flask(__name__)
+    app.config["TESTING"] = True
+
+    @app.route("/lookups/<int:count>")
+    def lookups(count):
+        with engine.connect() as conn:
+            for i in range(count):
+                conn.execute(text("SELECT :i"), {"i": i})
+        return "ok"
+
+    profiler.init_app(app)
+    return app, profiler
+
+
+def test_request_within_budget_reports_its_count(profiled_app):
+    app, profiler = profiled_app
+
+    response = app.test_client().get("/lookups/3")
+
+    assert response.status_code == 200
+    assert response.headers["X-Query-Count"] == "3"
+
+
+def test_request_over_budget_fails_in_strict_mode(profiled_app):
+    app, profiler = profiled_app
+
+    with pytest.raises(QueryBudgetExceeded, match="GET /lookups/5 ran 5 statements"):
+        app.test_client().get("/lookups/5")
+    assert profiler.repeated[-1]["executions"] == 5